@@ -2,6 +2,7 @@ from django.contrib import admin
 from unfold.admin import ModelAdmin
 
 from .models import Association, Notification, Session
+from .services import activate_session
 
 
 @admin.register(Association)
@@ -30,3 +31,13 @@ class SessionAdmin(ModelAdmin):
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         return queryset.select_related("association")
+
+    def save_model(self, request, obj, form, change):
+        # Activating goes through activate_session() so the association keeps
+        # a single active (and current) session
+        activate = obj.is_active and "is_active" in form.changed_data
+        if activate:
+            obj.is_active = False
+        super().save_model(request, obj, form, change)
+        if activate:
+            activate_session(obj.association, obj)
@@ -0,0 +1,100 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from association.models import Notification
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete read notifications that have not changed in the last N days, in "
+        "batches so the notifications table is never locked for long. Unread "
+        "notifications are always kept. Optionally archive them to a JSON Lines "
+        "file first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Delete read notifications older than this many days (default: 90).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows deleted per DELETE statement (default: 1000).",
+        )
+        parser.add_argument(
+            "--association",
+            type=int,
+            help="Only prune notifications of this association id.",
+        )
+        parser.add_argument(
+            "--archive",
+            help="Append each deleted notification to this JSON Lines file.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many notifications would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        batch_size = options["batch_size"]
+        if days < 1 or batch_size < 1:
+            raise CommandError("--days and --batch-size must be positive")
+
+        cutoff = timezone.now() - timedelta(days=days)
+        stale = Notification.objects.filter(is_read=True, updated_at__lt=cutoff)
+        if options["association"]:
+            stale = stale.filter(association_id=options["association"])
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"[dry-run] {stale.count()} read notification(s) older than "
+                f"{days} days would be deleted."
+            )
+            return
+
+        archive = open(options["archive"], "a") if options["archive"] else None
+        deleted_total = 0
+        try:
+            while True:
+                if archive is not None:
+                    rows = list(
+                        stale.order_by("pk").values(
+                            "id",
+                            "association_id",
+                            "message",
+                            "count",
+                            "total_amount",
+                            "created_at",
+                            "updated_at",
+                        )[:batch_size]
+                    )
+                    ids = [row["id"] for row in rows]
+                    for row in rows:
+                        archive.write(json.dumps(row, default=str) + "\n")
+                    archive.flush()
+                else:
+                    ids = list(
+                        stale.order_by("pk").values_list("pk", flat=True)[:batch_size]
+                    )
+                if not ids:
+                    break
+
+                deleted, _ = Notification.objects.filter(pk__in=ids).delete()
+                deleted_total += deleted
+                self.stdout.write(f"Deleted {deleted} (total {deleted_total})")
+        finally:
+            if archive is not None:
+                archive.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Pruned {deleted_total} read notification(s).")
+        )
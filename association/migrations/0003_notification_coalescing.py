@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:53
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    Notification = apps.get_model("association", "Notification")
+    Notification.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("association", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="count",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="total_amount",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=12, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["association", "-updated_at"], name="notif_assoc_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", True)),
+                fields=["updated_at"],
+                name="notif_read_updated_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:13
+
+from django.db import migrations, models
+
+from utils.media import LOGO_THUMBNAIL, cloudinary_urls
+
+
+def backfill_logo_urls(apps, schema_editor):
+    Association = apps.get_model("association", "Association")
+    for association in Association.objects.only("pk", "logo"):
+        association.logo_cdn_url, association.logo_thumbnail_url = cloudinary_urls(
+            association.logo, LOGO_THUMBNAIL
+        )
+        association.save(update_fields=["logo_cdn_url", "logo_thumbnail_url"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("association", "0003_notification_coalescing"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="association",
+            name="logo_cdn_url",
+            field=models.URLField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name="association",
+            name="logo_thumbnail_url",
+            field=models.URLField(blank=True, max_length=500),
+        ),
+        migrations.RunPython(backfill_logo_urls, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:23
+
+from django.db import migrations, models
+
+
+def deactivate_extra_sessions(apps, schema_editor):
+    # Keep the current session active (or else the newest active one)
+    Association = apps.get_model("association", "Association")
+    Session = apps.get_model("association", "Session")
+    for association in Association.objects.only("pk", "current_session"):
+        active = Session.objects.filter(association=association, is_active=True)
+        keep = active.filter(pk=association.current_session_id).first() or (
+            active.order_by("-created_at").first()
+        )
+        if keep is not None:
+            active.exclude(pk=keep.pk).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("association", "0004_cloudinary_url_cache"),
+    ]
+
+    operations = [
+        migrations.RunPython(deactivate_extra_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="session",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True)),
+                fields=("association",),
+                name="one_active_session_per_association",
+            ),
+        ),
+    ]
@@ -5,6 +5,7 @@ from django.core.exceptions import ValidationError
 from django.db import models
 
 from main.models import AdminUser
+from utils.media import LOGO_THUMBNAIL, refresh_cloudinary_urls
 from utils.utils import validate_file_type
 
 
@@ -33,6 +34,9 @@ class Association(models.Model):
         default="DuesPay/default.jpg",
         validators=[validate_file_type],
     )
+    # Delivery URLs of the logo, refreshed on upload (see utils.media)
+    logo_cdn_url = models.URLField(max_length=500, blank=True)
+    logo_thumbnail_url = models.URLField(max_length=500, blank=True)
     current_session = models.ForeignKey(
         "Session",
         null=True,
@@ -46,7 +50,9 @@ class Association(models.Model):
 
     @property
     def logo_url(self):
-        return self.logo.url if self.logo else ""
+        if self.logo_cdn_url or not self.logo:
+            return self.logo_cdn_url
+        return self.logo.url
 
     def save(self, *args, **kwargs):
         """Override save to ensure only one association exists"""
@@ -56,6 +62,11 @@ class Association(models.Model):
                 raise ValidationError(
                     "Only one association can exist at a time. Please delete the existing association first."
                 )
+        changed = refresh_cloudinary_urls(
+            self, "logo", "logo_cdn_url", "logo_thumbnail_url", LOGO_THUMBNAIL
+        )
+        if changed and kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], *changed}
         super().save(*args, **kwargs)
 
     @classmethod
@@ -79,18 +90,18 @@ class Session(models.Model):
     class Meta:
         unique_together = ("association", "title")
         ordering = ["-created_at"]
+        constraints = [
+            # Sessions are switched with association.services.activate_session()
+            models.UniqueConstraint(
+                fields=["association"],
+                condition=models.Q(is_active=True),
+                name="one_active_session_per_association",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.association.association_short_name} - {self.title}"
 
-    def save(self, *args, **kwargs):
-        # If this session is being set as active, deactivate other sessions for this association
-        if self.is_active:
-            Session.objects.filter(
-                association=self.association, is_active=True
-            ).exclude(pk=self.pk).update(is_active=False)
-        super().save(*args, **kwargs)
-
     @classmethod
     def generate_default_title(cls):
         current_year = datetime.now().year
@@ -103,7 +114,26 @@ class Notification(models.Model):
     )
     message = models.TextField()
     is_read = models.BooleanField(default=False)
+    # Number of transactions merged into this row (see NOTIFICATION_COALESCE_WINDOW)
+    count = models.PositiveIntegerField(default=1)
+    total_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["association", "-updated_at"], name="notif_assoc_updated_idx"
+            ),
+            # prune_notifications only ever deletes read rows
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(is_read=True),
+                name="notif_read_updated_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Notification for {self.association.association_short_name}: {self.message[:20]}"
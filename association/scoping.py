@@ -0,0 +1,92 @@
+"""
+Request scoping for the admin dashboard viewsets.
+
+Every dashboard list is scoped to the admin's association and to one of its
+sessions: the one named by ?session_id=, or the association's current
+session. resolve_scope() applies those rules once per request and memoizes
+the result on it, so get_queryset(), list() and the serializers share it.
+"""
+
+from rest_framework.exceptions import ValidationError
+
+from .models import Session
+
+
+class RequestScope:
+    """The association and session a request is scoped to"""
+
+    def __init__(self, association=None, session=None, session_requested=False):
+        self.association = association
+        self.session = session
+        # True when ?session_id= was given (whether or not it resolved)
+        self.session_requested = session_requested
+
+    @property
+    def session_not_found(self):
+        return self.session_requested and self.session is None
+
+    @property
+    def current_session(self):
+        return self.association.current_session if self.association else None
+
+
+def _resolve(request):
+    association = getattr(request.user, "association", None)
+    if association is None:
+        return RequestScope()
+
+    session_id = request.GET.get("session_id")
+    if not session_id:
+        return RequestScope(association, association.current_session)
+
+    # The current session is already loaded with the authenticated user
+    if str(association.current_session_id) == session_id:
+        return RequestScope(association, association.current_session, True)
+    try:
+        session = Session.objects.filter(
+            pk=int(session_id), association=association
+        ).first()
+    except ValueError:
+        session = None
+    return RequestScope(association, session, True)
+
+
+def resolve_scope(request):
+    """RequestScope for a (DRF or Django) request, computed once per request"""
+    http_request = getattr(request, "_request", request)
+    scope = getattr(http_request, "_association_scope", None)
+    if scope is None:
+        scope = _resolve(request)
+        http_request._association_scope = scope
+    return scope
+
+
+class SessionScopedMixin:
+    """
+    Viewset helpers built on resolve_scope(). The scope is also passed to
+    serializers as context["scope"].
+    """
+
+    @property
+    def scope(self):
+        return resolve_scope(self.request)
+
+    def scoped_queryset(self, queryset):
+        """Limit `queryset` to the scoped session (empty when there is none)"""
+        if self.scope.session is None:
+            return queryset.none()
+        return queryset.filter(session=self.scope.session)
+
+    def require_current_session(self):
+        """(association, current session) for creates, or a 400"""
+        scope = self.scope
+        if scope.association is None or scope.current_session is None:
+            raise ValidationError(
+                "No current session available. Please create a session first."
+            )
+        return scope.association, scope.current_session
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["scope"] = self.scope
+        return context
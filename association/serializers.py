@@ -67,7 +67,14 @@ class AssociationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Association
         fields = "__all__"
-        read_only_fields = ["admin", "bank_account", "payment_items", "logo_url"]
+        read_only_fields = [
+            "admin",
+            "bank_account",
+            "payment_items",
+            "logo_url",
+            "logo_cdn_url",
+            "logo_thumbnail_url",
+        ]
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -109,6 +116,22 @@ class SessionSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class SessionRolloverSerializer(SessionSerializer):
+    """The new session of a rollover, plus what to carry into it"""
+
+    carry_payers = serializers.BooleanField(default=False, write_only=True)
+    promote_levels = serializers.BooleanField(default=True, write_only=True)
+
+    class Meta(SessionSerializer.Meta):
+        fields = SessionSerializer.Meta.fields + ["carry_payers", "promote_levels"]
+        read_only_fields = SessionSerializer.Meta.read_only_fields + ["is_active"]
+
+    def create(self, validated_data):
+        validated_data.pop("carry_payers", None)
+        validated_data.pop("promote_levels", None)
+        return super().create(validated_data)
+
+
 class AssociationProfileSerializer(serializers.ModelSerializer):
     current_session = SessionSerializer(read_only=True)
     logo_url = serializers.ReadOnlyField()
@@ -122,6 +145,7 @@ class AssociationProfileSerializer(serializers.ModelSerializer):
             "association_type",
             "theme_color",
             "logo_url",
+            "logo_thumbnail_url",
             "current_session",
         ]
 
@@ -0,0 +1,301 @@
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .models import Association, Notification, Session
+
+
+def _coalesced_message(count, total_amount, payer):
+    return (
+        f"{count} new payments totalling ₦{total_amount}. Latest from {payer}."
+    )
+
+
+def create_notification_for_transaction(transaction):
+    """
+    Add a dashboard notification for a newly created transaction.
+
+    With NOTIFICATION_COALESCE_WINDOW set, a transaction arriving within that
+    many seconds of an unread notification's creation is merged into it in
+    place instead of adding a row.
+    """
+    association = transaction.association
+    amount = transaction.amount_paid
+    payer = f"{transaction.payer.first_name} {transaction.payer.last_name}"
+
+    window = settings.NOTIFICATION_COALESCE_WINDOW
+    if window:
+        with db_transaction.atomic():
+            notification = (
+                association.notifications.select_for_update()
+                .filter(
+                    is_read=False,
+                    created_at__gte=timezone.now() - timedelta(seconds=window),
+                )
+                .order_by("-created_at")
+                .first()
+            )
+            if notification is not None:
+                notification.count += 1
+                notification.total_amount = (notification.total_amount or 0) + amount
+                notification.message = _coalesced_message(
+                    notification.count, notification.total_amount, payer
+                )
+                notification.save(
+                    update_fields=["count", "total_amount", "message", "updated_at"]
+                )
+                return notification
+
+    # post_save bumps the cached unread counter (see notification_saved)
+    return association.notifications.create(
+        message=f"New transaction of ₦{amount} from {payer}.",
+        total_amount=amount,
+    )
+
+
+# With a shared cache (settings.SHARED_CACHE) the unread counter is kept in
+# the cache so the dashboard's constant unread-count polling doesn't COUNT the
+# notifications table. It is adjusted in place on create/mark-all-read and
+# dropped (recomputed on next read) on any other read-state change; the TTL
+# bounds drift from concurrent writers. A per-process cache would only see
+# its own worker's writes, so without one the counter and the poll cursor
+# are read from the database and never written to the cache.
+UNREAD_COUNT_TIMEOUT = 60 * 5
+
+
+def _unread_count_key(association_id):
+    return f"association:{association_id}:unread_notifications"
+
+
+def _notification_cursor_key(association_id):
+    return f"association:{association_id}:notification_cursor"
+
+
+def notification_cursor(value):
+    """Poll cursor (microseconds since the epoch) for an updated_at value"""
+    return int(value.timestamp() * 1_000_000) if value else 0
+
+
+def cursor_datetime(cursor):
+    return datetime.fromtimestamp(cursor / 1_000_000, tz=dt_timezone.utc)
+
+
+def _count_unread_notifications(association_id):
+    return Notification.objects.filter(
+        association_id=association_id, is_read=False
+    ).count()
+
+
+def unread_notification_count(association_id):
+    """Number of unread notifications for an association (cached when shared)"""
+    if not settings.SHARED_CACHE:
+        return _count_unread_notifications(association_id)
+    key = _unread_count_key(association_id)
+    count = cache.get(key)
+    if count is None:
+        count = _count_unread_notifications(association_id)
+        cache.add(key, count, UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_unread_notification_count(association_id):
+    if settings.SHARED_CACHE:
+        cache.delete(_unread_count_key(association_id))
+
+
+def _query_notification_cursor(association_id):
+    return notification_cursor(
+        Notification.objects.filter(association_id=association_id)
+        .order_by("-updated_at")
+        .values_list("updated_at", flat=True)
+        .first()
+    )
+
+
+def latest_notification_cursor(association_id):
+    """Cursor of the most recently added or updated notification"""
+    if not settings.SHARED_CACHE:
+        return _query_notification_cursor(association_id)
+    key = _notification_cursor_key(association_id)
+    cursor = cache.get(key)
+    if cursor is None:
+        cursor = _query_notification_cursor(association_id)
+        cache.add(key, cursor, timeout=None)
+    return cursor
+
+
+def notification_saved(notification, created, update_fields=None):
+    """Keep the cached counter and poll cursor in step with a saved notification"""
+    if not settings.SHARED_CACHE:
+        return
+    association_id = notification.association_id
+    if created:
+        if not notification.is_read:
+            try:
+                cache.incr(_unread_count_key(association_id))
+            except ValueError:
+                # Not cached yet; the next read counts from the database
+                pass
+    elif update_fields is None or "is_read" in update_fields:
+        invalidate_unread_notification_count(association_id)
+    cache.set(
+        _notification_cursor_key(association_id),
+        notification_cursor(notification.updated_at),
+        timeout=None,
+    )
+
+
+def mark_all_notifications_read(association_id):
+    """Mark every unread notification read in one UPDATE; returns the count"""
+    updated = Notification.objects.filter(
+        association_id=association_id, is_read=False
+    ).update(is_read=True)
+    if settings.SHARED_CACHE:
+        cache.set(_unread_count_key(association_id), 0, UNREAD_COUNT_TIMEOUT)
+    return updated
+
+
+# Cached per-association fragments live under a version key that is replaced
+# whenever the association (or its admin) is saved, so stale entries are
+# never read again and simply expire. A per-process cache only sees the bump
+# of the worker that saved, so without a shared cache (settings.SHARED_CACHE)
+# entries are kept briefly instead.
+ASSOCIATION_FRAGMENT_TIMEOUT = 60 * 60 * 24
+LOCAL_ASSOCIATION_FRAGMENT_TIMEOUT = 60
+
+
+def association_fragment_timeout():
+    """How long a cached association fragment may be served"""
+    if settings.SHARED_CACHE:
+        return ASSOCIATION_FRAGMENT_TIMEOUT
+    return LOCAL_ASSOCIATION_FRAGMENT_TIMEOUT
+
+
+def _association_version_key(association_id):
+    return f"association:{association_id}:version"
+
+
+def association_cache_version(association_id):
+    """Current version stamp for an association's cached fragments"""
+    return cache.get_or_set(
+        _association_version_key(association_id), time.time_ns(), timeout=None
+    )
+
+
+def bump_association_cache_version(association_id):
+    """Invalidate every cached fragment of an association"""
+    cache.set(_association_version_key(association_id), time.time_ns(), timeout=None)
+
+
+def association_email_context(association):
+    """
+    Static email fragments (name, logo URL, admin phone) for an association,
+    cached so bulk email rendering skips the Cloudinary URL build and the
+    admin lookup.
+    """
+    version = association_cache_version(association.pk)
+    key = f"association:{association.pk}:email_context:{version}"
+    context = cache.get(key)
+    if context is None:
+        context = {
+            "association_name": association.association_name,
+            "association_short_name": association.association_short_name,
+            "association_logo": association.logo_url,
+            "association_no": association.admin.phone_number,
+        }
+        cache.set(key, context, association_fragment_timeout())
+    return context
+
+
+def activate_session(association, session):
+    """
+    Make `session` the association's only active session and its current
+    session. Other sessions are switched off by one conditional UPDATE
+    before this one is switched on, so the one_active_session_per_association
+    index never sees two active rows; nothing is written that is already
+    in place.
+    """
+    with db_transaction.atomic():
+        # Lock the association so concurrent activations run one at a time
+        current_session_id = (
+            Association.objects.select_for_update()
+            .filter(pk=association.pk)
+            .values_list("current_session_id", flat=True)
+            .get()
+        )
+        Session.objects.filter(association=association, is_active=True).exclude(
+            pk=session.pk
+        ).update(is_active=False)
+        if not session.is_active:
+            session.is_active = True
+            session.save(update_fields=["is_active", "updated_at"])
+        if current_session_id != session.pk:
+            association.current_session = session
+            association.save(update_fields=["current_session"])
+    return session
+
+
+# Level a carried-forward payer moves to; final-year (600) payers have
+# graduated and are not carried forward when promoting
+NEXT_LEVEL = {"100": "200", "200": "300", "300": "400", "400": "500", "500": "600"}
+ROLLOVER_BATCH_SIZE = 2000
+
+
+def rollover_session(source, target, carry_payers=False, promote_levels=True):
+    """
+    Copy `source`'s payment items (and optionally its payers) into the
+    empty `target` session with bulk inserts. Call inside a transaction.
+    Returns (items copied, payers carried forward).
+    """
+    from payers.models import Payer
+    from payments.models import PaymentItem
+
+    # bulk_create skips PaymentItem.save(), so level_mask is copied as is
+    items = [
+        PaymentItem(
+            association_id=item.association_id,
+            session=target,
+            title=item.title,
+            amount=item.amount,
+            compulsory_for=item.compulsory_for,
+            level_mask=item.level_mask,
+            status=item.status,
+            is_active=item.is_active,
+        )
+        for item in source.payment_items.order_by("created_at", "pk")
+    ]
+    PaymentItem.objects.bulk_create(items, batch_size=ROLLOVER_BATCH_SIZE)
+
+    payers = []
+    if carry_payers:
+        fields = (
+            "association_id",
+            "first_name",
+            "last_name",
+            "email",
+            "level",
+            "phone_number",
+            "matric_number",
+            "faculty",
+            "department",
+        )
+        for row in source.payers.order_by("created_at", "pk").values(*fields):
+            if promote_levels and row["level"] != "All Levels":
+                row["level"] = NEXT_LEVEL.get(row["level"])
+                if row["level"] is None:
+                    continue
+            payers.append(Payer(session=target, **row))
+        Payer.objects.bulk_create(payers, batch_size=ROLLOVER_BATCH_SIZE)
+
+    # bulk_create sends no signals; drop anything cached while the rollover
+    # was in progress once it is visible
+    db_transaction.on_commit(
+        lambda: bump_association_cache_version(target.association_id)
+    )
+    return len(items), len(payers)
+
@@ -1,10 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from main.authentication import invalidate_cached_auth_user
 from main.models import AdminUser
-from transactions.models import Transaction
 
-from .models import Association
+from .models import Association, Notification, Session
+from .services import bump_association_cache_version, notification_saved
 
 
 @receiver(post_save, sender=AdminUser)
@@ -23,10 +24,51 @@ def create_association_for_user(sender, instance, created, **kwargs):
         )
 
 
-@receiver(post_save, sender=Transaction)
-def create_notification_for_transaction(sender, instance, created, **kwargs):
-    if created:
-        association = instance.association
-        payer = f"{instance.payer.first_name} {instance.payer.last_name}"
-        message = f"New transaction of ₦{instance.amount_paid} from {payer}."
-        association.notifications.create(message=message)
+@receiver(post_save, sender=Association)
+def invalidate_association_fragments(sender, instance, **kwargs):
+    bump_association_cache_version(instance.pk)
+
+
+@receiver(post_save, sender=AdminUser)
+def invalidate_admin_association_fragments(sender, instance, created, update_fields=None, **kwargs):
+    # Only the admin's phone number is part of the cached fragments
+    if created or (update_fields is not None and "phone_number" not in update_fields):
+        return
+    for association_id in Association.objects.filter(admin=instance).values_list(
+        "pk", flat=True
+    ):
+        bump_association_cache_version(association_id)
+
+
+@receiver(post_save, sender=Notification)
+def sync_notification_caches(sender, instance, created, update_fields=None, **kwargs):
+    # Deletes are handled by the caller (NotificationViewSet.perform_destroy);
+    # a post_delete receiver would stop prune_notifications' batch deletes
+    # from running as a single DELETE.
+    notification_saved(instance, created, update_fields)
+
+
+# Cached auth users carry their association and current session (see
+# main/authentication.py), so any save of those drops the admin's entry.
+@receiver(post_save, sender=AdminUser)
+@receiver(post_delete, sender=AdminUser)
+def invalidate_auth_user(sender, instance, **kwargs):
+    invalidate_cached_auth_user(instance.pk)
+
+
+@receiver(post_save, sender=Association)
+@receiver(post_delete, sender=Association)
+def invalidate_association_auth_user(sender, instance, **kwargs):
+    invalidate_cached_auth_user(instance.admin_id)
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def invalidate_session_auth_user(sender, instance, **kwargs):
+    admin_id = (
+        Association.objects.filter(pk=instance.association_id)
+        .values_list("admin_id", flat=True)
+        .first()
+    )
+    if admin_id is not None:
+        invalidate_cached_auth_user(admin_id)
@@ -1,3 +1,7 @@
+import time
+
+from django.conf import settings
+from django.db import transaction as db_transaction
 from rest_framework import generics, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
@@ -10,8 +14,25 @@ from .serializers import (
     AdminProfileSerializer,
     AssociationSerializer,
     NotificationSerializer,
+    SessionRolloverSerializer,
     SessionSerializer,
 )
+from .services import (
+    activate_session,
+    cursor_datetime,
+    invalidate_unread_notification_count,
+    latest_notification_cursor,
+    mark_all_notifications_read,
+    rollover_session,
+    unread_notification_count,
+)
+
+# Long-poll limits for NotificationViewSet.poll, in seconds. The view is
+# synchronous and holds its worker while it waits, so it answers at once
+# unless the client asks to wait, and only waits on a shared cache
+NOTIFICATION_POLL_TIMEOUT = 3
+NOTIFICATION_POLL_INTERVAL = 1
+
 
 class NotificationPagination(PageNumberPagination):
     page_size = 5
@@ -71,9 +92,10 @@ class NotificationViewSet(viewsets.ModelViewSet):
         try:
             # Since the user should be an AdminUser with a related Association
             if hasattr(self.request.user, "association"):
+                # Coalesced notifications move to the top when updated
                 return Notification.objects.filter(
                     association=self.request.user.association
-                ).order_by("-created_at")
+                ).order_by("-updated_at")
             return Notification.objects.none()
         except (AttributeError, Association.DoesNotExist):
             return Notification.objects.none()
@@ -90,6 +112,11 @@ class NotificationViewSet(viewsets.ModelViewSet):
         except (AttributeError, Association.DoesNotExist):
             raise ValidationError("Unable to determine user's association")
 
+    def perform_destroy(self, instance):
+        association_id = instance.association_id
+        super().perform_destroy(instance)
+        invalidate_unread_notification_count(association_id)
+
     @action(detail=False, methods=["post"], url_path="mark-all-read")
     def mark_all_read(self, request):
         """
@@ -99,22 +126,15 @@ class NotificationViewSet(viewsets.ModelViewSet):
             if hasattr(request.user, "association"):
                 association = request.user.association
 
-                # Get count of unread notifications before updating
-                unread_count = Notification.objects.filter(
-                    association=association, is_read=False
-                ).count()
-
-                # Mark all as read
-                updated_count = Notification.objects.filter(
-                    association=association, is_read=False
-                ).update(is_read=True)
+                # A single UPDATE; the rows it touched are the ones that were unread
+                updated_count = mark_all_notifications_read(association.pk)
 
                 return Response(
                     {
                         "success": True,
                         "message": f"Marked {updated_count} notifications as read",
                         "updated_count": updated_count,
-                        "total_unread_before": unread_count,
+                        "total_unread_before": updated_count,
                     },
                     status=status.HTTP_200_OK,
                 )
@@ -149,9 +169,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
             if hasattr(request.user, "association"):
                 association = request.user.association
 
-                unread_count = Notification.objects.filter(
-                    association=association, is_read=False
-                ).count()
+                unread_count = unread_notification_count(association.pk)
 
                 return Response(
                     {"unread_count": unread_count}, status=status.HTTP_200_OK
@@ -163,6 +181,58 @@ class NotificationViewSet(viewsets.ModelViewSet):
         except (AttributeError, Association.DoesNotExist):
             return Response({"unread_count": 0}, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["get"], url_path="poll")
+    def poll(self, request):
+        """
+        Poll for new or updated (coalesced) notifications changed after
+        `since` (the `cursor` returned by the previous poll), with the
+        unread count. Returns at once by default; with a shared cache
+        (settings.SHARED_CACHE) a client may wait up to `timeout` seconds
+        (at most NOTIFICATION_POLL_TIMEOUT) for a change, checking only the
+        cached cursor. Without one the cursor comes from the database, so
+        the view never waits.
+        """
+        try:
+            association = request.user.association
+        except (AttributeError, Association.DoesNotExist):
+            return Response(
+                {"notifications": [], "unread_count": 0, "cursor": 0},
+                status=status.HTTP_200_OK,
+            )
+
+        try:
+            since = int(request.query_params.get("since", 0))
+            timeout = float(request.query_params.get("timeout", 0))
+        except ValueError:
+            raise ValidationError("since and timeout must be numbers")
+        timeout = max(0.0, min(timeout, NOTIFICATION_POLL_TIMEOUT))
+        if not settings.SHARED_CACHE:
+            timeout = 0.0
+
+        deadline = time.monotonic() + timeout
+        cursor = latest_notification_cursor(association.pk)
+        while cursor <= since and time.monotonic() < deadline:
+            time.sleep(NOTIFICATION_POLL_INTERVAL)
+            cursor = latest_notification_cursor(association.pk)
+
+        notifications = []
+        if cursor > since:
+            notifications = NotificationSerializer(
+                Notification.objects.filter(
+                    association=association, updated_at__gt=cursor_datetime(since)
+                ).order_by("-updated_at")[: NotificationPagination.max_page_size],
+                many=True,
+            ).data
+
+        return Response(
+            {
+                "notifications": notifications,
+                "unread_count": unread_notification_count(association.pk),
+                "cursor": cursor,
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 class SessionViewSet(viewsets.ModelViewSet):
     serializer_class = SessionSerializer
@@ -185,17 +255,25 @@ class SessionViewSet(viewsets.ModelViewSet):
         # When creating a new session, it becomes active and current
         association = getattr(self.request.user, "association", None)
         if association:
-            # Deactivate all other sessions for this association
-            Session.objects.filter(association=association, is_active=True).update(is_active=False)
-            
-            # Create the new session as active
-            session = serializer.save(is_active=True)
-            
-            # Set as current session for the association
-            association.current_session = session
-            association.save()
+            # Inserted inactive so the one-active-session index holds until
+            # activate_session() has switched the others off
+            with db_transaction.atomic():
+                activate_session(association, serializer.save(is_active=False))
         else:
-            session = serializer.save()
+            serializer.save(is_active=False)
+
+    def perform_update(self, serializer):
+        # Switching a session on goes through activate_session() so the
+        # others are switched off first
+        activate = serializer.validated_data.get("is_active") and not (
+            serializer.instance.is_active
+        )
+        if not activate:
+            serializer.save()
+            return
+        with db_transaction.atomic():
+            session = serializer.save(is_active=False)
+            activate_session(session.association, session)
 
     @action(detail=True, methods=["post"])
     def set_current(self, request, pk=None):
@@ -211,18 +289,7 @@ class SessionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
-            # Deactivate all other sessions for this association
-            Session.objects.filter(association=association, is_active=True).exclude(
-                pk=session.pk
-            ).update(is_active=False)
-
-            # Activate this session
-            session.is_active = True
-            session.save()
-
-            # Set as current session
-            association.current_session = session
-            association.save()
+            activate_session(association, session)
 
             return Response(
                 {
@@ -242,6 +309,40 @@ class SessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @action(detail=True, methods=["post"])
+    def rollover(self, request, pk=None):
+        """
+        Start a new current session from this one: its payment items are
+        copied, and with carry_payers its payers too (moved up a level
+        unless promote_levels is false; 600 level payers are left behind).
+        """
+        source = self.get_object()
+        association = request.user.association
+        serializer = SessionRolloverSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with db_transaction.atomic():
+            session = activate_session(association, serializer.save())
+            items_copied, payers_carried = rollover_session(
+                source,
+                session,
+                carry_payers=serializer.validated_data["carry_payers"],
+                promote_levels=serializer.validated_data["promote_levels"],
+            )
+
+        return Response(
+            {
+                "success": True,
+                "message": f'Session "{session.title}" started from "{source.title}"',
+                "current_session": SessionSerializer(session).data,
+                "payment_items_copied": items_copied,
+                "payers_carried": payers_carried,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=False, methods=["get"])
     def current(self, request):
         """Get the current session for the association"""
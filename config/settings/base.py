@@ -44,6 +44,10 @@ UNFOLD = {
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # Compression must see the final body, so it sits above ConditionalGet
+    # (which adds ETags and turns matching If-None-Match requests into 304s)
+    "main.middleware.CompressionMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -86,8 +90,42 @@ STATIC_URL = "/static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Generated receipt PDFs, keyed by a hash of their content
+RECEIPT_PDF_CACHE_DIR = config(
+    "RECEIPT_PDF_CACHE_DIR", default=os.path.join(MEDIA_ROOT, "receipts")
+)
+
+# Oversized uploads are rejected while streaming; anything over 512 KB is
+# spooled to a temporary file instead of held in worker memory
+FILE_UPLOAD_HANDLERS = [
+    "utils.uploads.MaxSizeUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
+
 CORS_ALLOW_CREDENTIALS = True
 
+# Shared cache (Redis) when REDIS_URL is set so invalidations reach every
+# worker; per-process memory otherwise (local development).
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+# Caches whose invalidation has to reach every worker (auth users, versioned
+# fragments) are only used, or only kept briefly, when this is True
+SHARED_CACHE = bool(REDIS_URL)
+
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "EXCEPTION_HANDLER": "main.exceptions.custom_exception_handler",
@@ -131,6 +169,34 @@ GOOGLE_CLIENT_ID = config("GOOGLE_CLIENT_ID", default="")
 
 ERCASPAY_BASE_URL = config("ERCASPAY_BASE_URL", default="https://api.ercaspay.com/api/v1")
 
+# wsgi (sync gunicorn workers) or asgi (uvicorn workers); see run.sh
+SERVER_MODE = config("SERVER_MODE", default="wsgi")
+
+# Route provider-bound endpoints (checkout, status polling, webhook, bank verify)
+# to their async views. Enable together with SERVER_MODE=asgi.
+ASYNC_PROVIDER_VIEWS = config("ASYNC_PROVIDER_VIEWS", default=False, cast=bool)
+
+# The live dashboard stream (/api/transactions/stream/) holds its connection
+# open for minutes, which would pin a sync worker, and only sees events from
+# other workers through Redis pub/sub. It needs SERVER_MODE=asgi and REDIS_URL;
+# otherwise it answers 503 and dashboards poll the transaction list instead.
+LIVE_STREAM_ENABLED = SERVER_MODE == "asgi" and bool(REDIS_URL)
+
+# Responses smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = config("COMPRESSION_MIN_SIZE", default=1024, cast=int)
+
+# Merge new-transaction notifications created within this many seconds of an
+# unread one into that row ("12 new payments totalling ..."). 0 disables.
+NOTIFICATION_COALESCE_WINDOW = config(
+    "NOTIFICATION_COALESCE_WINDOW", default=0, cast=int
+)
+
+# OCR engine for proof-of-payment extraction (process_proof_extractions).
+# transactions.proofs.LocalOCRBackend works offline for development.
+PROOF_OCR_BACKEND = config(
+    "PROOF_OCR_BACKEND", default="transactions.proofs.GeminiOCRBackend"
+)
+
 # OCR_SPACE_API_KEY = config('OCR_SPACE_API_KEY', default='helloworld')
 
 # Logging configuration
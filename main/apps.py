@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class MainConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "main"
+
+    def ready(self):
+        # Configured here rather than in settings so that loading settings
+        # has no side effects
+        credentials = getattr(settings, "CLOUDINARY_STORAGE", None)
+        if credentials:
+            import cloudinary
+
+            cloudinary.config(
+                cloud_name=credentials["CLOUD_NAME"],
+                api_key=credentials["API_KEY"],
+                api_secret=credentials["API_SECRET"],
+            )
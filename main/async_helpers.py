@@ -0,0 +1,38 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import VersionedJWTAuthentication
+from .renderers import CustomJSONRenderer
+
+
+def envelope_response(data, status=200):
+    """
+    Render `data` with CustomJSONRenderer for plain (non-DRF) async views,
+    so they return the same {success, message, data} envelope as the API.
+    """
+    response = HttpResponse(status=status, content_type="application/json")
+    response.content = CustomJSONRenderer().render(
+        data, renderer_context={"response": response}
+    )
+    return response
+
+
+async def authenticate_jwt(request):
+    """
+    Run VersionedJWTAuthentication for a plain async view.
+    Returns (user, None) on success or (None, error_message).
+    """
+    try:
+        result = await sync_to_async(VersionedJWTAuthentication().authenticate)(
+            request
+        )
+    except (InvalidToken, TokenError):
+        return None, "Invalid or expired token"
+    except AuthenticationFailed as exc:
+        return None, str(exc.detail) or "Invalid credentials"
+
+    if result is None:
+        return None, "Authentication required"
+    return result[0], None
@@ -1,10 +1,103 @@
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 from rest_framework.exceptions import AuthenticationFailed
 
+from .models import AdminUser
+
+# With a shared cache (settings.SHARED_CACHE) authenticated users are cached
+# together with their association and current session, so request.user.association
+# needs no extra lookup. Entries are dropped whenever the user, association or a
+# session is saved (see association/signals.py); the TTL is a safety net. A
+# per-process cache would keep serving entries another worker dropped, so
+# without one the user is loaded on every request. Either way the
+# credentials (is_active, password, token_version) are read from the database.
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+
+
+def _auth_user_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def _load_auth_user(user_id):
+    return (
+        AdminUser.objects.select_related("association__current_session")
+        .filter(pk=user_id)
+        .first()
+    )
+
+
+def get_cached_auth_user(user_id):
+    """
+    AdminUser (with association and current session loaded) or None. Its
+    credential fields may be stale; views that save the user load it fresh.
+    """
+    if not settings.SHARED_CACHE:
+        return _load_auth_user(user_id)
+    key = _auth_user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = _load_auth_user(user_id)
+        if user is not None:
+            cache.set(key, user, AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+    # Revocations must apply at once, so check them against the database
+    credentials = (
+        AdminUser.objects.filter(pk=user_id)
+        .values_list("is_active", "password", "token_version")
+        .first()
+    )
+    if credentials is None:
+        return None
+    user.is_active, user.password, user.token_version = credentials
+    return user
+
+
+def invalidate_cached_auth_user(user_id):
+    cache.delete(_auth_user_key(user_id))
+
+
 class VersionedJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
-        user = super().get_user(validated_token)
+        # Same checks as JWTAuthentication.get_user, against the cached user
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = get_cached_auth_user(user_id)
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                "The user's password has been changed.", code="password_changed"
+            )
+
         token_version = validated_token.get("token_version", None)
         if token_version is None or token_version != user.token_version:
             raise AuthenticationFailed("Token is invalid or expired", code="token_not_valid")
-        return user
\ No newline at end of file
+        return user
+
+
+class QueryParamJWTAuthentication(VersionedJWTAuthentication):
+    """
+    Also accepts the access token as a ?token= query parameter, for
+    EventSource (SSE) clients which cannot set an Authorization header.
+    """
+
+    def authenticate(self, request):
+        if self.get_header(request) is not None:
+            return super().authenticate(request)
+        raw_token = request.GET.get("token")
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return self.get_user(validated_token), validated_token
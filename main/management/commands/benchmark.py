@@ -0,0 +1,420 @@
+import asyncio
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a micro-benchmark for a hot path and print throughput. "
+        "Each target is a bench_<target> method on this command."
+    )
+
+    def add_arguments(self, parser):
+        targets = sorted(
+            name[len("bench_"):] for name in dir(self) if name.startswith("bench_")
+        )
+        parser.add_argument("target", choices=targets, help="What to benchmark.")
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Number of operations to run (default: 50).",
+        )
+        parser.add_argument(
+            "--latency",
+            type=int,
+            default=200,
+            help="Simulated provider latency in milliseconds, for provider-bound "
+            "targets (default: 200).",
+        )
+
+    def handle(self, *args, **options):
+        target = options["target"]
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== Benchmark: {target} =="))
+        getattr(self, f"bench_{target}")(**options)
+
+    def _report(self, label, count, elapsed, extra=""):
+        rate = count / elapsed if elapsed else float("inf")
+        self.stdout.write(
+            f"{label:<28} {count:>6} ops  {elapsed:8.3f}s  {rate:10.1f} ops/s  {extra}"
+        )
+
+    def bench_checkout(self, requests, latency, **options):
+        """
+        Concurrent in-flight Ercaspay checkouts for one worker: the sync view
+        path (one request at a time per sync gunicorn worker) against the
+        async path (many awaiting the provider on one event loop).
+        The provider is simulated with a fixed latency; no network is used.
+        """
+        import httpx
+
+        from transactions.ercaspayServices import (
+            ercaspay_init_payment,
+            ercaspay_init_payment_async,
+        )
+
+        delay = latency / 1000
+        body = {
+            "requestSuccessful": True,
+            "responseMessage": "success",
+            "responseBody": {
+                "checkoutUrl": "https://checkout.example/pay",
+                "paymentReference": "ref",
+                "transactionReference": "ERCS|ref",
+            },
+        }
+        checkout = {
+            "amount": "1000.00",
+            "reference": "TX-0000-000-AA",
+            "customer": {"name": "Bench", "email": "bench@example.com"},
+            "redirect_url": "https://example.com/pay",
+        }
+
+        def fake_post(*args, **kwargs):
+            time.sleep(delay)
+            return mock.Mock(status_code=201, json=lambda: body)
+
+        with mock.patch(
+            "transactions.ercaspayServices.requests.post", side_effect=fake_post
+        ):
+            start = time.perf_counter()
+            for _ in range(requests):
+                ercaspay_init_payment(**checkout)
+            sync_elapsed = time.perf_counter() - start
+        self._report("sync worker", requests, sync_elapsed, "peak in-flight=1")
+
+        in_flight = peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(delay)
+            in_flight -= 1
+            return httpx.Response(201, json=body)
+
+        async def run_async():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                await asyncio.gather(
+                    *(
+                        ercaspay_init_payment_async(client=client, **checkout)
+                        for _ in range(requests)
+                    )
+                )
+
+        start = time.perf_counter()
+        asyncio.run(run_async())
+        async_elapsed = time.perf_counter() - start
+        self._report("async worker", requests, async_elapsed, f"peak in-flight={peak}")
+
+    def bench_receipt_render(self, requests, **options):
+        """
+        Receipt emails rendered per second for a bulk resend: the previous
+        path (template parsed per render, logo URL and admin phone rebuilt
+        per email) against build_receipt_email() with the cached template
+        loader and cached association fragments. Uses unsaved objects.
+        """
+        from decimal import Decimal
+
+        from cloudinary import CloudinaryResource
+        from django.template import Context, Engine
+        from django.utils import timezone
+
+        from association.models import Association, Session
+        from main.models import AdminUser
+        from payers.models import Payer
+        from transactions.emails import build_receipt_email
+        from transactions.models import Transaction, TransactionReceipt
+
+        admin = AdminUser(pk=0, first_name="Bench", phone_number="08000000000")
+        association = Association(
+            pk=0,
+            admin=admin,
+            association_name="Benchmark Association",
+            association_short_name="bench",
+            logo=CloudinaryResource("DuesPay/default.jpg"),
+        )
+        txn = Transaction(
+            payer=Payer(first_name="Ada", last_name="Obi", email="ada@example.com"),
+            association=association,
+            session=Session(title="2025/2026"),
+            amount_paid=Decimal("2500.00"),
+            reference_id="TX-0000-000-AA",
+            submitted_at=timezone.now(),
+        )
+        receipt = TransactionReceipt(transaction=txn, receipt_no="00001")
+
+        uncached = Engine(loaders=["django.template.loaders.app_directories.Loader"])
+        start = time.perf_counter()
+        for _ in range(requests):
+            context = {
+                "association_name": association.association_name,
+                "association_logo": association.logo_url,
+                "association_no": association.admin.phone_number,
+                "payer_name": f"{txn.payer.first_name} {txn.payer.last_name}",
+                "receipt_no": receipt.receipt_no,
+                "session_title": txn.session.title,
+                "transaction_ref": txn.reference_id,
+                "transaction_date": txn.submitted_at.strftime("%Y-%m-%d %H:%M:%S"),
+                "amount_paid": txn.amount_paid,
+                "transaction_receipt_url": f"/transactions/receipt/{receipt.receipt_id}/",
+            }
+            uncached.get_template("transactions/receipt_template.html").render(
+                Context(context)
+            )
+        self._report("uncached render", requests, time.perf_counter() - start)
+
+        build_receipt_email(receipt)  # warm the template and fragment caches
+        start = time.perf_counter()
+        for _ in range(requests):
+            build_receipt_email(receipt)
+        self._report("cached render", requests, time.perf_counter() - start)
+
+    def bench_serializers(self, requests, **options):
+        """
+        Dashboard list rows per second: the ModelSerializers against the
+        values()-based list projections, for `--requests` rows of
+        transactions, payers and payment items. The rows are created in a
+        transaction that is rolled back afterwards.
+        """
+        from decimal import Decimal
+
+        from django.db import transaction as db_transaction
+
+        from association.models import Association, Session
+        from main.models import AdminUser
+        from payers.models import Payer
+        from payers.serializers import (
+            PayerSerializer,
+            payer_list_rows,
+            payer_list_values,
+        )
+        from payments.models import PaymentItem
+        from payments.serializers import (
+            PaymentItemSerializer,
+            payment_item_list_rows,
+            payment_item_list_values,
+        )
+        from transactions.models import Transaction
+        from transactions.serializers import (
+            TransactionSerializer,
+            transaction_list_rows,
+            transaction_list_values,
+        )
+
+        with db_transaction.atomic():
+            # Only one association may exist, so reuse it when present
+            association = Association.objects.first()
+            if association is None:
+                association = AdminUser.objects.create(
+                    email="benchmark@duespay.invalid",
+                    first_name="Bench",
+                    last_name="Mark",
+                ).association
+            session = Session.objects.create(
+                association=association, title="Benchmark", is_active=False
+            )
+            items = PaymentItem.objects.bulk_create(
+                PaymentItem(
+                    association=association,
+                    session=session,
+                    title=f"Item {i}",
+                    amount=Decimal("1500.00"),
+                    status="compulsory",
+                    compulsory_for=["100", "200"],
+                )
+                for i in range(requests)
+            )
+            payers = Payer.objects.bulk_create(
+                Payer(
+                    association=association,
+                    session=session,
+                    first_name="Ada",
+                    last_name=f"Obi{i}",
+                    email=f"payer{i}@duespay.invalid",
+                    phone_number=f"080{i:08d}",
+                    matric_number=f"BM/{i:06d}",
+                    level="200",
+                )
+                for i in range(requests)
+            )
+            transactions = Transaction.objects.bulk_create(
+                Transaction(
+                    payer=payer,
+                    association=association,
+                    session=session,
+                    amount_paid=Decimal("1500.00"),
+                )
+                for payer in payers
+            )
+            Transaction.payment_items.through.objects.bulk_create(
+                Transaction.payment_items.through(
+                    transaction_id=txn.pk, paymentitem_id=items[0].pk
+                )
+                for txn in transactions
+            )
+
+            targets = [
+                (
+                    "transactions",
+                    Transaction.objects.filter(session=session).order_by("-submitted_at"),
+                    TransactionSerializer,
+                    transaction_list_values,
+                    transaction_list_rows,
+                ),
+                (
+                    "payers",
+                    Payer.objects.filter(session=session).order_by("-created_at"),
+                    PayerSerializer,
+                    payer_list_values,
+                    payer_list_rows,
+                ),
+                (
+                    "payment items",
+                    PaymentItem.objects.filter(session=session),
+                    PaymentItemSerializer,
+                    payment_item_list_values,
+                    payment_item_list_rows,
+                ),
+            ]
+            for label, queryset, serializer_class, values, rows in targets:
+                start = time.perf_counter()
+                serializer_class(queryset, many=True).data
+                self._report(f"{label}: serializer", requests, time.perf_counter() - start)
+                start = time.perf_counter()
+                rows(values(queryset))
+                self._report(f"{label}: projection", requests, time.perf_counter() - start)
+
+            db_transaction.set_rollback(True)
+
+    def bench_proof_urls(self, requests, **options):
+        """
+        Proof URLs for a 1000-transaction list page, `--requests` times:
+        building the delivery and thumbnail URLs with the Cloudinary SDK for
+        every row (as the list did before URLs were stored) against reading
+        the precomputed proof_cdn_url / proof_thumbnail_url strings.
+        """
+        from transactions.models import Transaction
+        from utils.media import PROOF_THUMBNAIL, cloudinary_urls
+
+        proof_field = Transaction._meta.get_field("proof_of_payment")
+        rows = []
+        for i in range(1000):
+            stored = f"image/upload/v1760000000/Duespay/proofs/proof_{i:04d}.jpg"
+            url, thumbnail_url = cloudinary_urls(
+                proof_field.to_python(stored), PROOF_THUMBNAIL
+            )
+            rows.append(
+                {
+                    "proof_of_payment": stored,
+                    "proof_cdn_url": url,
+                    "proof_thumbnail_url": thumbnail_url,
+                }
+            )
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            computed = [
+                cloudinary_urls(
+                    proof_field.to_python(row["proof_of_payment"]), PROOF_THUMBNAIL
+                )
+                for row in rows
+            ]
+        elapsed = time.perf_counter() - start
+        self._report(
+            "SDK per row",
+            requests,
+            elapsed,
+            f"{elapsed / requests * 1000:.2f} ms/1000 rows",
+        )
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            stored = [
+                (row["proof_cdn_url"], row["proof_thumbnail_url"]) for row in rows
+            ]
+        elapsed = time.perf_counter() - start
+        self._report(
+            "stored strings",
+            requests,
+            elapsed,
+            f"{elapsed / requests * 1000:.2f} ms/1000 rows, "
+            f"identical={computed == stored}",
+        )
+
+    def bench_renderer(self, requests, **options):
+        """
+        Encoding a 1000-transaction list page in the API envelope,
+        `--requests` times: DRF's stdlib JSONRenderer against
+        CustomJSONRenderer (orjson when installed). Rows have the
+        transaction_list_rows() shape; meta carries Decimal and datetime.
+        """
+        from decimal import Decimal
+
+        from django.utils import timezone
+        from rest_framework.renderers import JSONRenderer
+
+        from main import renderers
+
+        now = timezone.now()
+        rows = [
+            {
+                "id": i,
+                "payment_item_titles": ["Departmental Dues", "Lab Coat"],
+                "payer_first_name": "Adaeze",
+                "payer_last_name": f"Okonkwo{i}",
+                "payer_matric": f"CSC/2021/{i:04d}",
+                "payer_email": f"payer{i}@example.com",
+                "payer_name": f"Adaeze Okonkwo{i}",
+                "proof_of_payment_url": "",
+                "amount_paid": "2500.00",
+                "reference_id": f"TX-{i:04d}-123-AB",
+                "payment_provider_reference": f"ERCS|{i:012d}",
+                "is_verified": i % 3 != 0,
+                "is_expired": False,
+                "submitted_at": now,
+                "payer": i,
+                "association": 1,
+                "session": 1,
+                "payment_items": [1, 2],
+            }
+            for i in range(1000)
+        ]
+        page = {
+            "success": True,
+            "message": "Request successful",
+            "data": {
+                "count": 1000,
+                "next": None,
+                "previous": None,
+                "results": rows,
+                "meta": {
+                    "total_collections": Decimal("2500000.00"),
+                    "completed_payments": 667,
+                    "pending_payments": 333,
+                    "current_session": {"id": 1, "title": "2025/2026"},
+                },
+            },
+        }
+        context = {"response": None}
+
+        stdlib = JSONRenderer()
+        start = time.perf_counter()
+        for _ in range(requests):
+            expected = stdlib.render(page, None, context)
+        self._report("stdlib json", requests, time.perf_counter() - start)
+
+        custom = renderers.CustomJSONRenderer()
+        start = time.perf_counter()
+        for _ in range(requests):
+            encoded = custom.render(page, None, context)
+        backend = "orjson" if renderers.orjson is not None else "stdlib fallback"
+        self._report(
+            "CustomJSONRenderer",
+            requests,
+            time.perf_counter() - start,
+            f"{backend}, identical={encoded == expected}",
+        )
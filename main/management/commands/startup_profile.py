@@ -0,0 +1,167 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a fresh gunicorn/uvicorn worker imports before serving its first request
+BOOT_SCRIPT = """
+import importlib
+import django
+
+django.setup()
+importlib.import_module({urlconf!r})
+importlib.import_module({application!r})
+"""
+
+re_import_time = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def parse_import_times(stderr):
+    """
+    (name, depth, self_us, cumulative_us) for each module in `python -X
+    importtime` output, in the order the interpreter reports them.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = re_import_time.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, len(indent) // 2, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def package_costs(rows):
+    """
+    Microseconds per top-level package. A package is charged the cumulative
+    time of every import that enters it from another package, minus the
+    imports it makes into other packages in turn, so `anymail` is not charged
+    for the `requests` import its code triggers.
+    """
+    costs = {}
+    # importtime reports children before their parent; walk it backwards
+    # to see each parent before its children
+    parents = []
+    for name, depth, _, cumulative_us in reversed(rows):
+        del parents[depth:]
+        package = name.split(".")[0]
+        parent_package = parents[-1] if parents else None
+        if package != parent_package:
+            costs[package] = costs.get(package, 0) + cumulative_us
+            if parent_package is not None:
+                costs[parent_package] -= cumulative_us
+        parents.append(package)
+    return costs
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile what a fresh worker imports at startup (settings, apps, "
+        "URLconf and the WSGI application) with `python -X importtime`, "
+        "report the slowest modules and top-level packages, and fail when an "
+        "import-time budget is exceeded. Run it in CI to track boot time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=3,
+            help="Profile this many fresh interpreters and keep the fastest "
+            "time for each module, to filter out noise (default: 3).",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=20,
+            help="Number of modules and packages to list (default: 20).",
+        )
+        parser.add_argument(
+            "--max-total-ms",
+            type=float,
+            help="Fail when the whole boot import takes longer than this.",
+        )
+        parser.add_argument(
+            "--max-module-ms",
+            type=float,
+            help="Fail when any single top-level package (e.g. google, "
+            "cloudinary, rest_framework) takes longer than this to import.",
+        )
+
+    def _profile(self):
+        wsgi_module = settings.WSGI_APPLICATION.rsplit(".", 1)[0]
+        script = BOOT_SCRIPT.format(
+            urlconf=settings.ROOT_URLCONF, application=wsgi_module
+        )
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+        env.setdefault("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        rows = parse_import_times(result.stderr)
+        if result.returncode != 0:
+            errors = [
+                line
+                for line in result.stderr.splitlines()
+                if not line.startswith("import time:")
+            ]
+            raise CommandError("Boot import failed:\n" + "\n".join(errors[-20:]))
+        return rows
+
+    def handle(self, *args, **options):
+        runs = options["runs"]
+        top = options["top"]
+        if runs < 1 or top < 1:
+            raise CommandError("--runs and --top must be positive")
+
+        modules = {}
+        packages = {}
+        totals = []
+        for _ in range(runs):
+            rows = self._profile()
+            totals.append(sum(row[3] for row in rows if row[1] == 0))
+            for name, _, _, cumulative_us in rows:
+                modules[name] = min(modules.get(name, cumulative_us), cumulative_us)
+            for package, cost in package_costs(rows).items():
+                packages[package] = min(packages.get(package, cost), cost)
+
+        total_ms = min(totals) / 1000
+        self.stdout.write(self.style.MIGRATE_HEADING("== Slowest modules =="))
+        for name, cumulative_us in sorted(
+            modules.items(), key=lambda item: item[1], reverse=True
+        )[:top]:
+            self.stdout.write(f"{cumulative_us / 1000:10.1f} ms  {name}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("== Slowest packages =="))
+        ranked_packages = sorted(
+            packages.items(), key=lambda item: item[1], reverse=True
+        )
+        for package, cost_us in ranked_packages[:top]:
+            self.stdout.write(f"{cost_us / 1000:10.1f} ms  {package}")
+
+        self.stdout.write(
+            f"Total boot import time: {total_ms:.1f} ms "
+            f"({len(modules)} modules, best of {runs})"
+        )
+
+        failures = []
+        max_total_ms = options["max_total_ms"]
+        if max_total_ms is not None and total_ms > max_total_ms:
+            failures.append(
+                f"total {total_ms:.1f} ms exceeds {max_total_ms:g} ms"
+            )
+        max_module_ms = options["max_module_ms"]
+        if max_module_ms is not None:
+            failures.extend(
+                f"{package} {cost_us / 1000:.1f} ms exceeds {max_module_ms:g} ms"
+                for package, cost_us in ranked_packages
+                if cost_us / 1000 > max_module_ms
+            )
+        if failures:
+            raise CommandError("Import-time budget exceeded: " + "; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Import-time budget OK."))
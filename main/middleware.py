@@ -0,0 +1,76 @@
+import re
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Brotli level for dynamic responses: close to gzip's speed, smaller output
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+re_accept_encoding = re.compile(r"\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*")
+
+
+def accepted_encodings(header):
+    """Encodings from an Accept-Encoding header with a non-zero q-value"""
+    accepted = set()
+    for part in header.split(","):
+        match = re_accept_encoding.fullmatch(part)
+        if not match:
+            continue
+        encoding, q = match.groups()
+        try:
+            if q is not None and float(q) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(encoding.lower())
+    return accepted
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress API responses with Brotli when the client accepts it, gzip
+    otherwise. Only compressible content types of at least
+    COMPRESSION_MIN_SIZE bytes are compressed; streaming responses (the SSE
+    dashboard stream, PDF downloads) are passed through untouched.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        content_type = response.get("Content-Type", "").lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is None or "br" not in accepted:
+            # GZipMiddleware handles Vary, gzip negotiation and ETag weakening
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed_content = brotli.compress(response.content, quality=BROTLI_QUALITY)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+
+        # Same strong -> weak ETag handling as GZipMiddleware
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
@@ -0,0 +1,28 @@
+"""
+Helpers for values()-based list projections.
+
+Hot dashboard list endpoints build their rows straight from queryset.values()
+instead of running a ModelSerializer per object. These format values exactly
+like the DRF fields they replace, so the JSON output is unchanged.
+"""
+
+from django.utils import timezone
+
+
+def api_datetime(value):
+    """Same output as serializers.DateTimeField (ISO 8601, UTC as 'Z')"""
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def api_decimal(value, places=2):
+    """Same output as serializers.DecimalField with COERCE_DECIMAL_TO_STRING"""
+    if value is None:
+        return None
+    return f"{value:.{places}f}"
@@ -1,17 +1,56 @@
-from rest_framework.renderers import JSONRenderer
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson handles str/int/float/dict/list/datetime/date/UUID itself and hands
+# everything else (Decimal, lazy strings, querysets, timedelta...) to DRF's
+# encoder, so output matches the stdlib path.
+_drf_default = JSONEncoder().default
 
 
 class CustomJSONRenderer(JSONRenderer):
     """
     Custom renderer to format all API responses consistently.
+    Encodes with orjson when it is installed.
     """
 
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_drf_default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits or very deep nesting
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same strict-javascript-subset escaping as JSONRenderer
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
     def render(self, data, accepted_media_type=None, renderer_context=None):
         response = renderer_context.get("response", None)
 
         # If it's already our custom error/success format, return as is
         if isinstance(data, dict) and "success" in data and "message" in data:
-            return super().render(data, accepted_media_type, renderer_context)
+            return self.encode(data, accepted_media_type, renderer_context)
 
         # Determine success/failure
         success = True if response and response.status_code < 400 else False
@@ -30,4 +69,18 @@ class CustomJSONRenderer(JSONRenderer):
             "data": data if data is not None else {},
         }
 
-        return super().render(response_data, accepted_media_type, renderer_context)
+        return self.encode(response_data, accepted_media_type, renderer_context)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets text/event-stream (SSE) requests pass content negotiation. Streaming
+    views return the event stream themselves; this only renders error bodies.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return f"event: error\ndata: {json.dumps(data, default=str)}\n\n".encode()
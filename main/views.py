@@ -1,12 +1,11 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import EmailMultiAlternatives
+from django.db.models import F
 from django.http import HttpResponse
 from django.shortcuts import redirect
 from django.template.loader import render_to_string
 from django.utils import timezone
-from google.auth.transport import requests
-from google.oauth2 import id_token
 from rest_framework import generics
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
@@ -15,6 +14,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from .authentication import invalidate_cached_auth_user
 from .models import AdminUser
 from .serializers import (
     AdminUserSerializer,
@@ -42,7 +42,8 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         user = self.request.user
         if hasattr(user, "payer"):
             return user.payer
-        return user
+        # request.user may be the cached auth user; never save that one
+        return AdminUser.objects.get(pk=user.pk)
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
@@ -51,6 +52,10 @@ class GoogleLoginView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
+        # google-auth is only needed for this endpoint; keep it off the boot path
+        from google.auth.transport import requests
+        from google.oauth2 import id_token
+
         token = request.data.get("id_token")
 
         try:
@@ -192,7 +197,9 @@ class PasswordResetConfirmView(APIView):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_all(request):
-    user = request.user
-    user.token_version += 1
-    user.save(update_fields=["token_version"])
+    # Incremented in the database, not from the (possibly cached) request.user
+    AdminUser.objects.filter(pk=request.user.pk).update(
+        token_version=F("token_version") + 1
+    )
+    invalidate_cached_auth_user(request.user.pk)
     return Response({"message": "Logged out from all devices"})
\ No newline at end of file
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("association", "0004_cloudinary_url_cache"),
+        ("payers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payer",
+            index=models.Index(
+                fields=["session", "level"], name="payer_session_level_idx"
+            ),
+        ),
+    ]
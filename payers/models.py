@@ -41,3 +41,7 @@ class Payer(models.Model):
                 fields=["session", "matric_number"], name="unique_matric_per_session"
             ),
         ]
+        indexes = [
+            # Level filter of the payer list and dues ledger
+            models.Index(fields=["session", "level"], name="payer_session_level_idx"),
+        ]
@@ -1,5 +1,9 @@
+from django.db import models
 from rest_framework import serializers
 
+from association.scoping import resolve_scope
+from main.projections import api_datetime
+
 from .models import Payer
 
 
@@ -15,14 +19,14 @@ class PayerSerializer(serializers.ModelSerializer):
         return obj.transactions.count()
 
     def create(self, validated_data):
-        user = self.context["request"].user
-        association = user.association
+        scope = self.context.get("scope") or resolve_scope(self.context["request"])
+        association = scope.association
         validated_data["association"] = association
 
         # Get session from validated data or use current session
         session = validated_data.get("session")
         if not session and association:
-            session = association.current_session
+            session = scope.current_session
             if not session:
                 raise serializers.ValidationError(
                     "No current session available. Please create a session first."
@@ -32,6 +36,47 @@ class PayerSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+def payer_list_values(queryset):
+    """Columns for payer_list_rows(), with the transaction count annotated"""
+    return queryset.annotate(total_transactions=models.Count("transactions")).values(
+        "id",
+        "total_transactions",
+        "first_name",
+        "last_name",
+        "email",
+        "level",
+        "phone_number",
+        "matric_number",
+        "faculty",
+        "department",
+        "created_at",
+        "association_id",
+        "session_id",
+    )
+
+
+def payer_list_rows(values):
+    """Dashboard list rows, the same shape as PayerSerializer output"""
+    return [
+        {
+            "id": row["id"],
+            "total_transactions": row["total_transactions"],
+            "first_name": row["first_name"],
+            "last_name": row["last_name"],
+            "email": row["email"],
+            "level": row["level"],
+            "phone_number": row["phone_number"],
+            "matric_number": row["matric_number"],
+            "faculty": row["faculty"],
+            "department": row["department"],
+            "created_at": api_datetime(row["created_at"]),
+            "association": row["association_id"],
+            "session": row["session_id"],
+        }
+        for row in values
+    ]
+
+
 class PayerCheckSerializer(serializers.Serializer):
     association_short_name = serializers.CharField()
     matric_number = serializers.CharField()
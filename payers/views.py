@@ -1,15 +1,24 @@
 from django.db import models
+from django.db.models import Exists
 from rest_framework import status, viewsets
-from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 
-from association.models import Association, Session
+from association.models import Association
+from association.scoping import SessionScopedMixin
+from main.projections import api_decimal
+from payments.eligibility import outstanding_items, unpaid_items, with_outstanding
 
 from .models import Payer
-from .serializers import PayerCheckSerializer, PayerSerializer
+from .serializers import (
+    PayerCheckSerializer,
+    PayerSerializer,
+    payer_list_rows,
+    payer_list_values,
+)
 from .services import PayerService
 
 
@@ -68,35 +77,14 @@ class PayerCheckView(APIView):
         )
 
 
-class PayerViewSet(viewsets.ModelViewSet):
+class PayerViewSet(SessionScopedMixin, viewsets.ModelViewSet):
     queryset = Payer.objects.all()
     serializer_class = PayerSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = PayerPagination
 
     def get_queryset(self):
-        association = getattr(self.request.user, "association", None)
-        queryset = Payer.objects.none()
-
-        if association:
-            # Get session_id from query params or use current session
-            session_id = self.request.query_params.get("session_id")
-
-            if session_id:
-                # Validate that session belongs to this association
-                try:
-                    session = Session.objects.get(
-                        id=session_id, association=association
-                    )
-                    queryset = Payer.objects.filter(session=session)
-                except Session.DoesNotExist:
-                    queryset = Payer.objects.none()
-            elif association.current_session:
-                # Use current session if no session_id provided
-                queryset = Payer.objects.filter(session=association.current_session)
-            else:
-                # No session available, return empty queryset
-                queryset = Payer.objects.none()
+        queryset = self.scoped_queryset(Payer.objects.all())
 
         # Order by creation date
         queryset = queryset.order_by("-created_at")
@@ -131,23 +119,113 @@ class PayerViewSet(viewsets.ModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        association = getattr(self.request.user, "association", None)
-        if not association or not association.current_session:
-            raise ValidationError(
-                "No current session available. Please create a session first."
-            )
+        association, session = self.require_current_session()
 
         serializer.save(
             association=association,
-            session=association.current_session,  # Auto-assign current session
+            session=session,  # Auto-assign current session
         )
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
+        # Rows are projected from values() rather than PayerSerializer
+        values = payer_list_values(queryset)
+        page = self.paginate_queryset(values)
+        if page is not None:
+            return self.get_paginated_response(payer_list_rows(page))
+
+        return Response(payer_list_rows(values))
+
+    @action(detail=False, methods=["get"])
+    def balances(self, request):
+        """
+        Outstanding compulsory dues per payer for the scoped session,
+        paginated and filtered like the payer list. Served from the same
+        SQL as the ledger.
+        """
+        values = with_outstanding(self.filter_queryset(self.get_queryset())).values(
+            "id",
+            "first_name",
+            "last_name",
+            "matric_number",
+            "level",
+            "total_due",
+            "outstanding_amount",
+        )
+        page = self.paginate_queryset(values)
+        payers = list(page if page is not None else values)
+        rows = self._with_outstanding_items(payers)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(queryset, many=True)
+            return self.get_paginated_response(rows)
+        return Response(rows)
+
+    def _with_outstanding_items(self, payers):
+        """API rows for with_outstanding() values, plus each unpaid item"""
+        items = (
+            outstanding_items(
+                Payer.objects.filter(pk__in=[payer["id"] for payer in payers])
+            )
+            if payers
+            else {}
+        )
+        rows = []
+        for payer in payers:
+            row = {**payer}
+            for field in ("total_due", "outstanding_amount"):
+                if field in row:
+                    row[field] = api_decimal(row[field])
+            row["outstanding_items"] = [
+                {**item, "amount": api_decimal(item["amount"])}
+                for item in items.get(payer["id"], [])
+            ]
+            rows.append(row)
+        return rows
+
+    @action(detail=False, methods=["get"])
+    def ledger(self, request):
+        """
+        Outstanding dues ledger for the scoped session. Takes the list's
+        search/level/faculty/department filters, plus ?status=outstanding
+        (default), paid or all, and ?item=<payment item id> for payers who
+        still owe that item. Most indebted payers first.
+        """
+        queryset = with_outstanding(self.filter_queryset(self.get_queryset()))
+
+        status_filter = request.query_params.get("status", "outstanding")
+        if status_filter == "outstanding":
+            queryset = queryset.filter(outstanding_count__gt=0)
+        elif status_filter == "paid":
+            queryset = queryset.filter(outstanding_count=0)
+        elif status_filter != "all":
+            return Response(
+                {"error": "status must be outstanding, paid or all."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        return Response(serializer.data)
+        item = request.query_params.get("item")
+        if item:
+            if not item.isdigit():
+                return Response(
+                    {"error": "item must be a payment item id."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = queryset.filter(Exists(unpaid_items().filter(pk=item)))
+
+        values = queryset.order_by("-outstanding_amount", "last_name", "pk").values(
+            "id",
+            "first_name",
+            "last_name",
+            "matric_number",
+            "level",
+            "faculty",
+            "department",
+            "outstanding_count",
+            "outstanding_amount",
+        )
+        page = self.paginate_queryset(values)
+        payers = list(page if page is not None else values)
+        # Item breakdown for the returned page only
+        rows = self._with_outstanding_items(payers)
+        if page is not None:
+            return self.get_paginated_response(rows)
+        return Response(rows)
@@ -0,0 +1,89 @@
+"""
+Async (ASGI) version of VerifyBankAccountView, enabled with
+ASYNC_PROVIDER_VIEWS (see payments/urls.py).
+"""
+
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from association.models import Association
+from main.async_helpers import authenticate_jwt, envelope_response
+
+from .bankServices import VerifyBankService
+from .serializers import BankAccountVerificationSerializer
+
+logger = logging.getLogger(__name__)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def verify_bank_account_async(request):
+    """Verify bank account details only - NO SAVING"""
+    user, auth_error = await authenticate_jwt(request)
+    if user is None:
+        return envelope_response(
+            {"success": False, "message": auth_error, "errors": {}}, status=401
+        )
+
+    if not await Association.objects.filter(admin=user).aexists():
+        return envelope_response(
+            {
+                "success": False,
+                "message": "User is not associated with any association.",
+                "errors": {"user": ["No association found"]},
+            },
+            status=400,
+        )
+
+    try:
+        data = json.loads(request.body.decode("utf-8") or "{}")
+    except json.JSONDecodeError:
+        data = {}
+
+    # Bank code validation reads the (cached) Paystack bank list synchronously
+    serializer = BankAccountVerificationSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return envelope_response(
+            {
+                "success": False,
+                "message": "Validation failed",
+                "errors": serializer.errors,
+            },
+            status=400,
+        )
+
+    account_number = serializer.validated_data["account_number"]
+    bank_code = serializer.validated_data["bank_code"]
+    verification_data = await VerifyBankService.verify_account_async(
+        account_number, bank_code
+    )
+
+    if not verification_data:
+        return envelope_response(
+            {
+                "success": False,
+                "message": "Bank account verification failed. Please check your details.",
+                "errors": {"verification": ["Invalid account details"]},
+            },
+            status=400,
+        )
+
+    return envelope_response(
+        {
+            "success": True,
+            "message": "Bank account verified successfully",
+            "data": {
+                "account_name": verification_data.get("account_name", ""),
+                "bank_name": verification_data.get("bank_name", ""),
+                "account_number": verification_data.get(
+                    "account_number", account_number
+                ),
+                "bank_code": verification_data.get("bank_code", bank_code),
+                "verified": True,
+            },
+        }
+    )
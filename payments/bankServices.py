@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime, timezone
 
+import httpx
 import requests
 from django.conf import settings
 from django.core.cache import cache
@@ -107,19 +108,55 @@ class VerifyBankService:
             return fallback_banks
 
     @staticmethod
-    def verify_account(account_number, bank_code):
-        """
-        Verify bank account using Paystack.
-        Returns dict with keys: account_name, bank_name, account_number, bank_code.
-        """
-        print(f"[{_ts()}] [VERIFY] acct={account_number} bank={bank_code}")
-        
+    def _resolve_request(account_number, bank_code):
         # Paystack endpoint: GET /bank/resolve
         url = f"{VerifyBankService.BASE_URL.rstrip('/')}/bank/resolve"
         params = {
             "account_number": str(account_number),
             "bank_code": str(bank_code)
         }
+        return url, params
+
+    @staticmethod
+    def _parse_resolve_response(ok, status_code, data, account_number, bank_code):
+        # Paystack returns { status: true/false, message: "", data: {...} }
+        if not ok or not data.get("status"):
+            logger.error(
+                f"[{_ts()}][VERIFY][ERR] status={status_code} body={data}"
+            )
+            print(f"[{_ts()}] [VERIFY][ERR] status={status_code} msg={data.get('message', 'Unknown error')}")
+            return None
+
+        d = data.get("data") or {}
+        if d.get("account_name"):
+            result = {
+                "account_name": d.get("account_name"),
+                "account_number": str(account_number),
+                "bank_code": str(bank_code),
+                "bank_name": "",  # Paystack doesn't return bank name in resolve, we can look it up if needed
+                # Optional fields for compatibility
+                "first_name": "",
+                "last_name": "",
+                "other_name": "",
+            }
+            logger.info(
+                f"[{_ts()}][VERIFY][OK] acct={result['account_number']} name={result['account_name']}"
+            )
+            print(f"[{_ts()}] [VERIFY][OK] acct={result['account_number']} name={result['account_name']}")
+            return result
+
+        logger.warning(f"[{_ts()}][VERIFY] No account_name in response: {data}")
+        print(f"[{_ts()}] [VERIFY] No account_name found")
+        return None
+
+    @staticmethod
+    def verify_account(account_number, bank_code):
+        """
+        Verify bank account using Paystack.
+        Returns dict with keys: account_name, bank_name, account_number, bank_code.
+        """
+        print(f"[{_ts()}] [VERIFY] acct={account_number} bank={bank_code}")
+        url, params = VerifyBankService._resolve_request(account_number, bank_code)
 
         try:
             resp = requests.get(
@@ -130,38 +167,41 @@ class VerifyBankService:
                 if resp.headers.get("content-type", "").startswith("application/json")
                 else {}
             )
+            return VerifyBankService._parse_resolve_response(
+                resp.ok, resp.status_code, data, account_number, bank_code
+            )
             
-            # Paystack returns { status: true/false, message: "", data: {...} }
-            if not resp.ok or not data.get("status"):
-                logger.error(
-                    f"[{_ts()}][VERIFY][ERR] status={resp.status_code} body={data}"
-                )
-                print(f"[{_ts()}] [VERIFY][ERR] status={resp.status_code} msg={data.get('message', 'Unknown error')}")
-                return None
-
-            d = data.get("data") or {}
-            if d.get("account_name"):
-                result = {
-                    "account_name": d.get("account_name"),
-                    "account_number": str(account_number),
-                    "bank_code": str(bank_code),
-                    "bank_name": "",  # Paystack doesn't return bank name in resolve, we can look it up if needed
-                    # Optional fields for compatibility
-                    "first_name": "",
-                    "last_name": "",
-                    "other_name": "",
-                }
-                logger.info(
-                    f"[{_ts()}][VERIFY][OK] acct={result['account_number']} name={result['account_name']}"
+        except Exception as e:
+            logger.error(f"[{_ts()}][VERIFY][EXC] {e}", exc_info=True)
+            print(f"[{_ts()}] [VERIFY][EXC] {str(e)}")
+            return None
+
+    @staticmethod
+    async def verify_account_async(account_number, bank_code, client=None):
+        """
+        Async variant of verify_account() for the ASGI views.
+        """
+        url, params = VerifyBankService._resolve_request(account_number, bank_code)
+
+        try:
+            if client is None:
+                async with httpx.AsyncClient(timeout=20) as http:
+                    resp = await http.get(
+                        url, headers=VerifyBankService.HEADERS, params=params
+                    )
+            else:
+                resp = await client.get(
+                    url, headers=VerifyBankService.HEADERS, params=params
                 )
-                print(f"[{_ts()}] [VERIFY][OK] acct={result['account_number']} name={result['account_name']}")
-                return result
+            data = (
+                resp.json()
+                if resp.headers.get("content-type", "").startswith("application/json")
+                else {}
+            )
+            return VerifyBankService._parse_resolve_response(
+                resp.is_success, resp.status_code, data, account_number, bank_code
+            )
 
-            logger.warning(f"[{_ts()}][VERIFY] No account_name in response: {data}")
-            print(f"[{_ts()}] [VERIFY] No account_name found")
-            return None
-            
         except Exception as e:
             logger.error(f"[{_ts()}][VERIFY][EXC] {e}", exc_info=True)
-            print(f"[{_ts()}] [VERIFY][EXC] {str(e)}")
             return None
@@ -0,0 +1,182 @@
+"""
+Which payment items a payer owes, by level.
+
+PaymentItem.compulsory_for holds level strings ("300", "All Levels"). Each
+level is also packed into PaymentItem.level_mask, one bit per level, so
+"items due for a 300-level payer" is an indexed lookup on the masks that
+have the 300 bit set instead of a Python scan over every item's list.
+
+What a payer still owes is one SQL anti-join (unpaid_items), shared by the
+ledger's totals and filters and its per-item breakdown.
+"""
+
+from decimal import Decimal
+
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+
+from .models import PaymentItem
+
+LEVELS = ("100", "200", "300", "400", "500", "600")
+LEVEL_BITS = {level: 1 << index for index, level in enumerate(LEVELS)}
+ALL_LEVELS = "All Levels"
+ALL_LEVELS_MASK = (1 << len(LEVELS)) - 1
+
+
+def level_mask(levels):
+    """Bitmask for a compulsory_for list"""
+    if not levels:
+        return 0
+    if ALL_LEVELS in levels:
+        return ALL_LEVELS_MASK
+    mask = 0
+    for level in levels:
+        mask |= LEVEL_BITS.get(str(level), 0)
+    return mask
+
+
+def level_bit(level):
+    """Bit(s) of a payer level; an "All Levels" payer matches every level"""
+    if level == ALL_LEVELS:
+        return ALL_LEVELS_MASK
+    return LEVEL_BITS.get(str(level), 0)
+
+
+def masks_matching(level):
+    """Every level_mask value that includes `level`, for an indexed IN lookup"""
+    bit = level_bit(level)
+    return [mask for mask in range(1, ALL_LEVELS_MASK + 1) if mask & bit]
+
+
+def due_items(session, level):
+    """Active compulsory items of `session` that a `level` payer must pay"""
+    return PaymentItem.objects.filter(
+        session=session,
+        status="compulsory",
+        is_active=True,
+        level_mask__in=masks_matching(level),
+    )
+
+
+def payer_level_bit():
+    """level_bit() of Payer.level as a SQL expression"""
+    return Case(
+        *(When(level=level, then=Value(bit)) for level, bit in LEVEL_BITS.items()),
+        When(level=ALL_LEVELS, then=Value(ALL_LEVELS_MASK)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def payer_due_items():
+    """
+    Due items of the outer payer's session for the outer payer's
+    `level_bit` annotation. For use as a subquery of with_outstanding()
+    payers.
+    """
+    return (
+        PaymentItem.objects.filter(
+            session=OuterRef("session"), status="compulsory", is_active=True
+        )
+        .annotate(
+            payer_bit=ExpressionWrapper(
+                F("level_mask").bitand(OuterRef("level_bit")),
+                output_field=IntegerField(),
+            )
+        )
+        .filter(payer_bit__gt=0)
+    )
+
+
+def unpaid_items():
+    """
+    payer_due_items() that no verified transaction of the payer in that
+    session includes: an anti-join (NOT EXISTS) against the transaction
+    items table.
+    """
+    from transactions.models import Transaction
+
+    paid = Transaction.payment_items.through.objects.filter(
+        paymentitem_id=OuterRef("pk"),
+        transaction__payer_id=OuterRef(OuterRef("pk")),
+        transaction__session_id=OuterRef("session"),
+        transaction__is_verified=True,
+    )
+    return payer_due_items().filter(~Exists(paid))
+
+
+def _item_totals(items):
+    """Single-row count and amount subqueries of per-payer `items`"""
+    # Grouping by session (one value per payer) turns the aggregate into a
+    # single-row subquery
+    items = items.order_by().values("session")
+    count = Coalesce(Subquery(items.annotate(n=Count("pk")).values("n")), 0)
+    amount = Coalesce(
+        Subquery(items.annotate(total=Sum("amount")).values("total")),
+        Value(Decimal("0")),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+    return count, amount
+
+
+def with_outstanding(payers):
+    """
+    `payers` annotated with total_due, outstanding_count and
+    outstanding_amount, all computed in SQL so they can be filtered,
+    ordered and paginated on.
+    """
+    _, total_due = _item_totals(payer_due_items())
+    outstanding_count, outstanding_amount = _item_totals(unpaid_items())
+    return payers.annotate(level_bit=payer_level_bit()).annotate(
+        total_due=total_due,
+        outstanding_count=outstanding_count,
+        outstanding_amount=outstanding_amount,
+    )
+
+
+def outstanding_items(payers):
+    """
+    {payer id: [unpaid item dicts]} for a page of `payers` (a Payer
+    queryset), from the same anti-join as with_outstanding(). Two queries:
+    the items of the payers' sessions, then one EXISTS column per item.
+    """
+    items = list(
+        PaymentItem.objects.filter(
+            session__in=payers.values("session"),
+            status="compulsory",
+            is_active=True,
+            level_mask__gt=0,
+        )
+        .order_by("pk")
+        .values("id", "title", "amount")
+    )
+    if not items:
+        return {}
+
+    owes = {
+        f"owes_{item['id']}": Exists(unpaid_items().filter(pk=item["id"]))
+        for item in items
+    }
+    rows = (
+        payers.order_by()
+        .annotate(level_bit=payer_level_bit())
+        .annotate(**owes)
+        .values("pk", *owes)
+    )
+    return {
+        row["pk"]: [item for item in items if row[f"owes_{item['id']}"]]
+        for row in rows
+    }
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:15
+
+from django.db import migrations, models
+
+# The level bits as of this migration (payments.eligibility may change later)
+LEVEL_BITS = {"100": 1, "200": 2, "300": 4, "400": 8, "500": 16, "600": 32}
+ALL_LEVELS = "All Levels"
+ALL_LEVELS_MASK = 63
+
+
+def level_mask(levels):
+    if ALL_LEVELS in levels:
+        return ALL_LEVELS_MASK
+    mask = 0
+    for level in levels:
+        mask |= LEVEL_BITS.get(str(level), 0)
+    return mask
+
+
+def backfill_level_mask(apps, schema_editor):
+    PaymentItem = apps.get_model("payments", "PaymentItem")
+    items = list(
+        PaymentItem.objects.filter(status="compulsory").only("pk", "compulsory_for")
+    )
+    for item in items:
+        item.level_mask = level_mask(item.compulsory_for or [ALL_LEVELS])
+    PaymentItem.objects.bulk_update(items, ["level_mask"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("association", "0004_cloudinary_url_cache"),
+        ("payments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paymentitem",
+            name="level_mask",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_level_mask, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="paymentitem",
+            index=models.Index(
+                condition=models.Q(("is_active", True), ("status", "compulsory")),
+                fields=["session", "level_mask"],
+                name="payitem_due_level_idx",
+            ),
+        ),
+    ]
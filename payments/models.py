@@ -41,9 +41,35 @@ class PaymentItem(models.Model):
         Session, on_delete=models.CASCADE, related_name="payment_items"
     )
     compulsory_for = models.JSONField(blank=True, null=True, default=list)
+    # compulsory_for as one bit per level (see payments.eligibility);
+    # 0 for optional items
+    level_mask = models.PositiveSmallIntegerField(default=0, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # "Items due for level L" is an IN lookup on level_mask
+            models.Index(
+                fields=["session", "level_mask"],
+                condition=models.Q(status="compulsory", is_active=True),
+                name="payitem_due_level_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.status}"
+
+    def save(self, *args, **kwargs):
+        from .eligibility import ALL_LEVELS, level_mask
+
+        if self.status != "compulsory":
+            self.level_mask = 0
+        else:
+            # Compulsory with no levels means every level, as in the serializer
+            self.level_mask = level_mask(self.compulsory_for or [ALL_LEVELS])
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "level_mask"}
+        super().save(*args, **kwargs)
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from main.projections import api_datetime, api_decimal
+
 from .bankServices import VerifyBankService
 from .models import PaymentItem, ReceiverBankAccount
 
@@ -76,6 +78,41 @@ class PaymentItemSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+def payment_item_list_values(queryset):
+    """Columns for payment_item_list_rows(), as a values() queryset"""
+    return queryset.values(
+        "id",
+        "compulsory_for",
+        "title",
+        "amount",
+        "level_mask",
+        "status",
+        "is_active",
+        "created_at",
+        "association_id",
+        "session_id",
+    )
+
+
+def payment_item_list_rows(values):
+    """Dashboard list rows, the same shape as PaymentItemSerializer output"""
+    return [
+        {
+            "id": row["id"],
+            "compulsory_for": list(row["compulsory_for"] or []),
+            "title": row["title"],
+            "amount": api_decimal(row["amount"]),
+            "level_mask": row["level_mask"],
+            "status": row["status"],
+            "is_active": row["is_active"],
+            "created_at": api_datetime(row["created_at"]),
+            "association": row["association_id"],
+            "session": row["session_id"],
+        }
+        for row in values
+    ]
+
+
 class ReceiverBankAccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReceiverBankAccount
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
+from .async_views import verify_bank_account_async
 from .views import (
     BankListView,
     PaymentItemViewSet,
@@ -13,7 +15,13 @@ router = DefaultRouter()
 router.register("bank-account", ReceiverBankAccountViewSet)
 router.register("payment-items", PaymentItemViewSet)
 
+# Async twin for the ASGI (uvicorn) run mode
+if settings.ASYNC_PROVIDER_VIEWS:
+    verify_bank_view = verify_bank_account_async
+else:
+    verify_bank_view = VerifyBankAccountView.as_view()
+
 urlpatterns = [
     path("bank-account/all-banks/", BankListView.as_view(), name="bank-list"),
-    path("bank-account/verify/", VerifyBankAccountView.as_view(), name="verify-bank"),
+    path("bank-account/verify/", verify_bank_view, name="verify-bank"),
 ] + router.urls
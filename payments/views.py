@@ -1,57 +1,42 @@
 import logging
+from decimal import Decimal
 
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from association.models import Session
+from association.scoping import SessionScopedMixin
+from main.projections import api_decimal
 
 from .bankServices import VerifyBankService
+from .eligibility import ALL_LEVELS, LEVEL_BITS, due_items
 from .models import PaymentItem, ReceiverBankAccount
 from .serializers import (
     BankAccountVerificationSerializer,
     PaymentItemSerializer,
     ReceiverBankAccountSerializer,
+    payment_item_list_rows,
+    payment_item_list_values,
 )
 
 logger = logging.getLogger(__name__)
 
 
-class PaymentItemViewSet(viewsets.ModelViewSet):
+class PaymentItemViewSet(SessionScopedMixin, viewsets.ModelViewSet):
     queryset = PaymentItem.objects.all()
     serializer_class = PaymentItemSerializer
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
-        association = getattr(self.request.user, "association", None)
-        if not association or not association.current_session:
-            raise ValidationError(
-                "No current session available. Please create a session first."
-            )
+        association, session = self.require_current_session()
 
-        serializer.save(association=association, session=association.current_session)
+        serializer.save(association=association, session=session)
 
     def get_queryset(self):
-        association = getattr(self.request.user, "association", None)
-        queryset = PaymentItem.objects.none()
-
-        if association:
-            session_id = self.request.query_params.get("session_id")
-
-            if session_id:
-                try:
-                    session = Session.objects.get(
-                        id=session_id, association=association
-                    )
-                    queryset = PaymentItem.objects.filter(session=session)
-                except Session.DoesNotExist:
-                    queryset = PaymentItem.objects.none()
-            elif association.current_session:
-                queryset = PaymentItem.objects.filter(
-                    session=association.current_session
-                )
+        queryset = self.scoped_queryset(PaymentItem.objects.all())
 
         # Search by title
         search = self.request.query_params.get("search")
@@ -80,13 +65,37 @@ class PaymentItemViewSet(viewsets.ModelViewSet):
                 {"results": [], "count": 0, "message": "No payment items found."}
             )
 
-        page = self.paginate_queryset(queryset)
+        # Rows are projected from values() rather than PaymentItemSerializer
+        values = payment_item_list_values(queryset)
+        page = self.paginate_queryset(values)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(payment_item_list_rows(page))
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(payment_item_list_rows(values))
+
+    @action(detail=False, methods=["get"])
+    def due(self, request):
+        """Active compulsory items a payer of ?level= must pay this session"""
+        level = request.query_params.get("level")
+        if level not in LEVEL_BITS and level != ALL_LEVELS:
+            return Response(
+                {"error": "A valid level (100-600 or All Levels) is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        items = self.scoped_queryset(PaymentItem.objects.all())
+        if self.scope.session is not None:
+            items = due_items(self.scope.session, level)
+        values = list(payment_item_list_values(items.order_by("created_at")))
+        return Response(
+            {
+                "level": level,
+                "results": payment_item_list_rows(values),
+                "count": len(values),
+                "total_due": api_decimal(
+                    sum((row["amount"] for row in values), Decimal("0"))
+                ),
+            }
+        )
 
 
 class ReceiverBankAccountViewSet(viewsets.ModelViewSet):
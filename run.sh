@@ -1,3 +1,7 @@
 #!/usr/bin/env bash
 set -o errexit
-gunicorn config.wsgi:application --env DJANGO_SETTINGS_MODULE=config.settings.prod
\ No newline at end of file
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    gunicorn config.asgi:application -k uvicorn_worker.UvicornWorker --env DJANGO_SETTINGS_MODULE=config.settings.prod
+else
+    gunicorn config.wsgi:application --env DJANGO_SETTINGS_MODULE=config.settings.prod
+fi
\ No newline at end of file
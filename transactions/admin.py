@@ -1,7 +1,7 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
 
-from .models import Transaction, TransactionReceipt
+from .models import ProofExtraction, ProofFingerprint, Transaction, TransactionReceipt
 
 
 @admin.register(Transaction)
@@ -12,6 +12,8 @@ class TransactionAdmin(ModelAdmin):
         "association",
         "amount_paid",
         "is_verified",
+        "duplicate_of",
+        "possible_duplicate_of",
         "submitted_at",
     )
     search_fields = (
@@ -28,3 +30,17 @@ class TransactionReceiptAdmin(ModelAdmin):
     list_display = ("receipt_no", "transaction", "issued_at")
     search_fields = ("receipt_no", "transaction__reference_id")
     list_filter = ("issued_at",)
+
+
+@admin.register(ProofExtraction)
+class ProofExtractionAdmin(ModelAdmin):
+    list_display = ("sha256", "status", "amounts", "receipt_date", "attempts", "updated_at")
+    search_fields = ("sha256",)
+    list_filter = ("status",)
+    readonly_fields = ("sha256", "text", "backend", "error", "created_at", "updated_at")
+
+
+@admin.register(ProofFingerprint)
+class ProofFingerprintAdmin(ModelAdmin):
+    list_display = ("transaction", "phash")
+    search_fields = ("transaction__reference_id",)
@@ -0,0 +1,152 @@
+"""
+Verified collection analytics for dashboard charts.
+
+Each session's aggregates (a day or week series plus breakdowns by payment
+item, payer level and faculty) are computed with one GROUP BY query per
+breakdown and cached under a per-session version key. The lifecycle
+dispatcher (transactions/signals.py) bumps the version when a transaction of
+the session is verified, unverified or deleted while verified; other edits
+(payer details, item titles) show up when the entry expires. A bump only
+reaches the cache of the worker that made it, so without a shared cache
+(settings.SHARED_CACHE) entries are kept briefly. Multi-session requests
+combine the cached per-session results.
+"""
+
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.db.models.functions import TruncDate, TruncWeek
+
+from .models import Transaction
+
+ANALYTICS_TIMEOUT = 60 * 60
+LOCAL_ANALYTICS_TIMEOUT = 60
+BUCKETS = {
+    "day": TruncDate("submitted_at"),
+    # Monday of the week, in the current time zone
+    "week": TruncWeek("submitted_at", output_field=models.DateField()),
+}
+
+
+def _analytics_version_key(session_id):
+    return f"analytics:session:{session_id}:version"
+
+
+def invalidate_session_analytics(session_id):
+    """Drop the cached analytics of a session"""
+    cache.set(_analytics_version_key(session_id), time.time_ns(), timeout=None)
+
+
+def _totals(queryset, name, expression):
+    """Verified amount and count per value of `expression`, as `name` rows"""
+    return list(
+        queryset.values(**{name: expression})
+        .annotate(amount=models.Sum("amount_paid"), count=models.Count("pk"))
+        .order_by(name)
+    )
+
+
+def compute_session_analytics(session_id, bucket="day"):
+    """Uncached aggregates of a session's verified transactions"""
+    verified = Transaction.objects.filter(
+        session_id=session_id, is_verified=True, is_expired=False
+    )
+    series = _totals(verified, "date", BUCKETS[bucket])
+
+    # Item breakdowns count each item's price once per transaction
+    items = list(
+        Transaction.payment_items.through.objects.filter(
+            transaction__in=verified
+        )
+        .values("paymentitem_id", "paymentitem__title")
+        .annotate(
+            amount=models.Sum("paymentitem__amount"),
+            count=models.Count("transaction_id"),
+        )
+        .order_by("paymentitem_id")
+    )
+
+    return {
+        "session_id": session_id,
+        "amount": sum((row["amount"] for row in series), Decimal("0")),
+        "count": sum(row["count"] for row in series),
+        "series": series,
+        "by_item": [
+            {
+                "item": row["paymentitem_id"],
+                "title": row["paymentitem__title"],
+                "amount": row["amount"],
+                "count": row["count"],
+            }
+            for row in items
+        ],
+        "by_level": _totals(verified, "level", models.F("payer__level")),
+        "by_faculty": _totals(verified, "faculty", models.F("payer__faculty")),
+    }
+
+
+def session_analytics(session_id, bucket="day"):
+    """compute_session_analytics(), cached until the verified totals change"""
+    version = cache.get_or_set(
+        _analytics_version_key(session_id), time.time_ns(), timeout=None
+    )
+    key = f"analytics:session:{session_id}:{bucket}:{version}"
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = compute_session_analytics(session_id, bucket)
+        cache.set(
+            key,
+            analytics,
+            ANALYTICS_TIMEOUT if settings.SHARED_CACHE else LOCAL_ANALYTICS_TIMEOUT,
+        )
+    return analytics
+
+
+def _merge(rows, key):
+    """Sum amount/count of rows sharing `key`, in key order"""
+    merged = defaultdict(lambda: {"amount": Decimal("0"), "count": 0})
+    for row in rows:
+        merged[row[key]]["amount"] += row["amount"]
+        merged[row[key]]["count"] += row["count"]
+    # None (e.g. no faculty) sorts last
+    return [
+        {key: value, **merged[value]}
+        for value in sorted(merged, key=lambda value: (value is None, value or ""))
+    ]
+
+
+def combine_session_analytics(sessions, bucket="day"):
+    """Analytics of several sessions: summed series and breakdowns"""
+    per_session = [
+        (session, session_analytics(session.pk, bucket)) for session in sessions
+    ]
+    return {
+        "amount": sum((a["amount"] for _, a in per_session), Decimal("0")),
+        "count": sum(a["count"] for _, a in per_session),
+        "series": _merge((row for _, a in per_session for row in a["series"]), "date"),
+        "by_session": [
+            {
+                "session": session.pk,
+                "title": session.title,
+                "amount": analytics["amount"],
+                "count": analytics["count"],
+            }
+            for session, analytics in per_session
+        ],
+        # Items belong to one session, so they are listed rather than merged
+        "by_item": [
+            {**row, "session": session.pk}
+            for session, analytics in per_session
+            for row in analytics["by_item"]
+        ],
+        "by_level": _merge(
+            (row for _, a in per_session for row in a["by_level"]), "level"
+        ),
+        "by_faculty": _merge(
+            (row for _, a in per_session for row in a["by_faculty"]), "faculty"
+        ),
+    }
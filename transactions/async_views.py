@@ -0,0 +1,243 @@
+"""
+Async (ASGI) versions of the provider-bound transaction endpoints.
+
+They mirror InitiatePaymentView, PaymentStatusView and ercaspay_webhook but
+await Ercaspay through httpx and use Django's async ORM, so a single uvicorn
+worker can keep many checkouts in flight while the provider responds.
+Enabled with ASYNC_PROVIDER_VIEWS (see transactions/urls.py).
+"""
+
+import json
+import logging
+from decimal import Decimal
+
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from association.models import Association, Session
+from main.async_helpers import envelope_response
+from payers.models import Payer
+from payments.models import PaymentItem
+
+from .ercaspayServices import (
+    ercaspay_init_payment_async,
+    is_ercaspay_payment_successful,
+    verify_ercaspay_transaction_async,
+)
+from .models import Transaction, TransactionReceipt
+from .views import (
+    build_checkout_customer,
+    build_checkout_metadata,
+    checkout_redirect_url,
+    webhook_transaction_lookup,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def initiate_payment_async(request):
+    try:
+        data = json.loads(request.body.decode("utf-8") or "{}")
+    except json.JSONDecodeError:
+        return envelope_response({"error": "Invalid JSON body"}, status=400)
+
+    required = ["payer_id", "association_id", "session_id", "payment_item_ids"]
+    missing = [k for k in required if k not in data]
+    if missing:
+        return envelope_response(
+            {"error": f"Missing fields: {', '.join(missing)}"}, status=400
+        )
+
+    try:
+        payer = await Payer.objects.aget(pk=data["payer_id"])
+        association = await Association.objects.aget(pk=data["association_id"])
+        session = await Session.objects.aget(
+            pk=data["session_id"], association=association
+        )
+    except (Payer.DoesNotExist, Association.DoesNotExist, Session.DoesNotExist):
+        return envelope_response(
+            {"error": "Invalid payer_id, association_id, or session_id"}, status=400
+        )
+
+    item_ids = data.get("payment_item_ids") or []
+    if not isinstance(item_ids, list) or not item_ids:
+        return envelope_response(
+            {"error": "payment_item_ids must be a non-empty list"}, status=400
+        )
+    items = [
+        item
+        async for item in PaymentItem.objects.filter(id__in=item_ids, session=session)
+    ]
+    if len(items) != len(set(item_ids)):
+        return envelope_response(
+            {"error": "One or more payment items not found for the session"},
+            status=400,
+        )
+
+    # Ercaspay handles fees on the checkout page (Customer Bears Fees setting)
+    base_amount = sum((item.amount for item in items), Decimal("0.00"))
+    total_with_fees = base_amount
+    transaction_fee = Decimal("0.00")
+
+    txn = await Transaction.objects.acreate(
+        payer=payer,
+        association=association,
+        amount_paid=base_amount,
+        is_verified=False,
+        session=session,
+    )
+    await txn.payment_items.aset(items)
+
+    logger.info(
+        f"[INITIATE][ASYNC] ref={txn.reference_id} base={base_amount} fee={transaction_fee} total={total_with_fees}"
+    )
+
+    try:
+        ercas_res = await ercaspay_init_payment_async(
+            amount=str(total_with_fees),
+            currency="NGN",
+            reference=txn.reference_id,
+            customer=build_checkout_customer(payer),
+            redirect_url=checkout_redirect_url(),
+            metadata=build_checkout_metadata(
+                txn, association, payer, base_amount, transaction_fee, total_with_fees
+            ),
+        )
+    except Exception as e:
+        logger.exception(
+            f"[INITIATE][ASYNC][ERROR] ref={txn.reference_id} Ercaspay init failed: {e}"
+        )
+        return envelope_response({"error": str(e)}, status=400)
+
+    data_obj = ercas_res.get("data") or {}
+    ercas_reference = data_obj.get("ercas_reference")
+    if ercas_reference:
+        txn.payment_provider_reference = ercas_reference
+        await txn.asave(update_fields=["payment_provider_reference"])
+
+    checkout_url = data_obj.get("authorization_url")
+    if not checkout_url:
+        logger.error(
+            f"[INITIATE][ASYNC][ERROR] ref={txn.reference_id} Missing authorization_url resp={ercas_res}"
+        )
+        return envelope_response(
+            {
+                "error": "Ercaspay did not return an authorization URL",
+                "provider_response": ercas_res,
+            },
+            status=502,
+        )
+
+    return envelope_response(
+        {
+            "reference_id": txn.reference_id,
+            "base_amount": str(base_amount),
+            "transaction_fee": str(transaction_fee),
+            "total_amount": str(total_with_fees),
+            "checkout_url": checkout_url,
+            "ercas_reference": ercas_reference,
+        },
+        status=201,
+    )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def ercaspay_webhook_async(request):
+    """
+    Handles Ercaspay webhook events for payment verification
+    """
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except json.JSONDecodeError:
+        logger.error("[ERCASPAY_WEBHOOK] invalid JSON")
+        return HttpResponse(status=200)
+
+    logger.info(f"[ERCASPAY_WEBHOOK] payload={payload}")
+
+    tx_ref = payload.get("transaction_reference")
+    pay_ref = payload.get("payment_reference")
+    if not tx_ref and not pay_ref:
+        logger.warning("[ERCASPAY_WEBHOOK] No reference found in payload")
+        return HttpResponse(status=200)
+
+    try:
+        txn = await Transaction.objects.filter(
+            webhook_transaction_lookup(pay_ref, tx_ref)
+        ).afirst()
+    except Exception as e:
+        logger.error(f"[ERCASPAY_WEBHOOK] Error finding transaction: {e}")
+        return HttpResponse(status=200)
+
+    if not txn:
+        logger.warning(
+            f"[ERCASPAY_WEBHOOK] No transaction found for pay_ref={pay_ref} tx_ref={tx_ref}"
+        )
+        return HttpResponse(status=200)
+
+    if txn.is_verified:
+        logger.info(f"[ERCASPAY_WEBHOOK] Already verified ref={txn.reference_id}")
+        return HttpResponse(status=200)
+
+    try:
+        verification_result = await verify_ercaspay_transaction_async(txn.reference_id)
+        if is_ercaspay_payment_successful(verification_result):
+            txn.is_verified = True
+            txn.is_expired = False
+            await txn.asave(update_fields=["is_verified", "is_expired"])
+            logger.info(f"[ERCASPAY_WEBHOOK][VERIFIED] ref={txn.reference_id}")
+        else:
+            logger.info(
+                f"[ERCASPAY_WEBHOOK] Transaction not successful yet ref={txn.reference_id}"
+            )
+    except Exception as e:
+        logger.error(
+            f"[ERCASPAY_WEBHOOK] Error verifying transaction ref={txn.reference_id}: {str(e)}"
+        )
+
+    return HttpResponse(status=200)
+
+
+@require_http_methods(["GET"])
+async def payment_status_async(request, reference_id: str):
+    """
+    Simple polling endpoint for frontend after redirect.
+    """
+    txn = await Transaction.objects.filter(reference_id=reference_id).afirst()
+    if txn is None:
+        return envelope_response({"exists": False}, status=200)
+
+    if not txn.is_verified:
+        try:
+            verify_ref = txn.payment_provider_reference or reference_id
+            verification_result = await verify_ercaspay_transaction_async(verify_ref)
+            if is_ercaspay_payment_successful(verification_result):
+                txn.is_verified = True
+                txn.is_expired = False
+                await txn.asave(update_fields=["is_verified", "is_expired"])
+                logger.info(
+                    f"[PAYMENT_STATUS][POLLING_VERIFIED] ref={txn.reference_id}"
+                )
+        except Exception as e:
+            logger.error(
+                f"[PAYMENT_STATUS][ERROR] ref={reference_id} verify failed: {e}"
+            )
+
+    receipt_id = await (
+        TransactionReceipt.objects.filter(transaction=txn)
+        .values_list("receipt_id", flat=True)
+        .afirst()
+    )
+    return envelope_response(
+        {
+            "exists": True,
+            "reference_id": txn.reference_id,
+            "is_verified": txn.is_verified,
+            "amount_paid": str(txn.amount_paid),
+            "receipt_id": receipt_id,
+        },
+        status=200,
+    )
@@ -4,6 +4,8 @@ from django.conf import settings
 from django.core.mail import EmailMessage, EmailMultiAlternatives
 from django.template.loader import render_to_string
 
+from association.services import association_email_context
+
 
 def send_admin_new_transaction_email(admin, association, transaction):
     subject = "New Transaction Alert"
@@ -11,6 +13,7 @@ def send_admin_new_transaction_email(admin, association, transaction):
         "admin": admin,
         "association": association,
         "transaction": transaction,
+        **association_email_context(association),
     }
     html_content = render_to_string("transactions/new_transaction.html", context)
     text_content = (
@@ -32,24 +35,23 @@ def send_admin_new_transaction_email(admin, association, transaction):
     email.send(fail_silently=False)
 
 
-def send_receipt_email(receipt):
-    """Email: Send receipt link to payer"""
+def build_receipt_email(receipt, connection=None):
+    """Email: Build (but don't send) the receipt link email for a payer"""
     transaction = receipt.transaction
     association = transaction.association
+    fragments = association_email_context(association)
     current_year_short = str(datetime.now().year)[-2:]
-    receipt_no = f"{association.association_short_name.upper()}/{receipt.receipt_no}/{current_year_short}"
+    receipt_no = f"{fragments['association_short_name'].upper()}/{receipt.receipt_no}/{current_year_short}"
 
-    subject = f"Payment Receipt #{receipt_no} - {association.association_name}"
+    subject = f"Payment Receipt #{receipt_no} - {fragments['association_name']}"
 
     context = {
+        **fragments,
         "payer_name": f"{transaction.payer.first_name} {transaction.payer.last_name}",
         "receipt_no": receipt_no,
         "session_title": transaction.session.title if transaction.session else "N/A",
         "transaction_ref": transaction.reference_id,
         "transaction_date": transaction.submitted_at.strftime("%Y-%m-%d %H:%M:%S"),
-        "association_name": association.association_name,
-        "association_logo": association.logo.url if association.logo else "",
-        "association_no": association.admin.phone_number,
         "amount_paid": transaction.amount_paid,
         "transaction_receipt_url": f"{settings.FRONTEND_URL}/transactions/receipt/{receipt.receipt_id}/",
     }
@@ -61,7 +63,12 @@ def send_receipt_email(receipt):
         body=message,
         from_email=settings.DEFAULT_FROM_EMAIL,
         to=[transaction.payer.email],
+        connection=connection,
     )
-
     email.content_subtype = "html"
-    email.send(fail_silently=False)
+    return email
+
+
+def send_receipt_email(receipt):
+    """Email: Send receipt link to payer"""
+    build_receipt_email(receipt).send(fail_silently=False)
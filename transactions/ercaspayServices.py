@@ -2,6 +2,9 @@ import hashlib
 import hmac
 import json
 import logging
+from contextlib import asynccontextmanager
+
+import httpx
 import requests
 from django.conf import settings
 from decimal import Decimal, ROUND_HALF_UP
@@ -48,32 +51,22 @@ def is_valid_ercaspay_signature(raw_body: bytes, header_signature: str) -> bool:
     # If comparison fails, we might need to check if they use a different algo.
     return hmac.compare_digest(expected, header_signature)
 
-def ercaspay_init_payment(
-    *,
-    amount: str,
-    currency: str = "NGN",
-    reference: str,
-    customer: dict,
-    redirect_url: str,
-    metadata: dict | None = None,
-    description: str = "Dues Payment"
-) -> dict:
-    """
-    Initialize Ercaspay payment
-    Endpoint: POST /payment/initiate
-    """
-    base_url = get_ercaspay_base_url()
-    secret_key = get_ercaspay_secret_key()
-    
+def _ercaspay_headers(json_body: bool = True) -> dict:
     headers = {
-        "Authorization": f"Bearer {secret_key}",
-        "Content-Type": "application/json",
+        "Authorization": f"Bearer {get_ercaspay_secret_key()}",
         "Accept": "application/json",
     }
-    
+    if json_body:
+        headers["Content-Type"] = "application/json"
+    return headers
+
+
+def _init_payment_payload(
+    *, amount, currency, reference, customer, redirect_url, metadata, description
+) -> dict:
     phone_number = format_phone_number(customer.get("phone_number"))
 
-    payload = {
+    return {
         "amount": float(amount),
         "paymentReference": reference,
         "paymentMethods": "card,bank-transfer,qrcode,ussd",
@@ -86,31 +79,73 @@ def ercaspay_init_payment(
         "metadata": metadata or {}
     }
 
+
+def _parse_init_response(status_code: int, response_data: dict, reference: str) -> dict:
+    logger.info(f"[ERCASPAY][RES] status={status_code} data={str(response_data)[:200]}")
+
+    if status_code in [200, 201] and response_data.get("requestSuccessful"):
+        data = response_data.get("responseBody", {})
+        return {
+            "status": True,
+            "data": {
+                "authorization_url": data.get("checkoutUrl"),
+                "access_code": data.get("paymentReference"),
+                "reference": reference,
+                "ercas_reference": data.get("transactionReference")
+            },
+            "message": response_data.get("responseMessage", "Success")
+        }
+
+    error_msg = response_data.get("responseMessage") or response_data.get("errorMessage", "Failed to initiate payment")
+    logger.error(f"[ERCASPAY][ERR] {error_msg}")
+    raise Exception(error_msg)
+
+
+def _parse_verify_response(status_code: int, response_data: dict) -> dict:
+    if status_code == 200 and response_data.get("requestSuccessful"):
+         return {
+            "status": True,
+            "data": response_data.get("responseBody", {}),
+            "message": response_data.get("responseMessage", "Success")
+         }
+
+    return {
+        "status": False,
+        "status_code": status_code,
+        "message": response_data.get("responseMessage", "Verification failed")
+    }
+
+
+def ercaspay_init_payment(
+    *,
+    amount: str,
+    currency: str = "NGN",
+    reference: str,
+    customer: dict,
+    redirect_url: str,
+    metadata: dict | None = None,
+    description: str = "Dues Payment"
+) -> dict:
+    """
+    Initialize Ercaspay payment
+    Endpoint: POST /payment/initiate
+    """
+    payload = _init_payment_payload(
+        amount=amount,
+        currency=currency,
+        reference=reference,
+        customer=customer,
+        redirect_url=redirect_url,
+        metadata=metadata,
+        description=description,
+    )
+
     try:
-        url = f"{base_url}/payment/initiate"
+        url = f"{get_ercaspay_base_url()}/payment/initiate"
         logger.info(f"[ERCASPAY][REQ] url={url} ref={reference} amount={amount}")
         
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        response_data = response.json()
-        
-        logger.info(f"[ERCASPAY][RES] status={response.status_code} data={str(response_data)[:200]}")
-
-        if response.status_code in [200, 201] and response_data.get("requestSuccessful"):
-            data = response_data.get("responseBody", {})
-            return {
-                "status": True,
-                "data": {
-                    "authorization_url": data.get("checkoutUrl"),
-                    "access_code": data.get("paymentReference"),
-                    "reference": reference,
-                    "ercas_reference": data.get("transactionReference")
-                },
-                "message": response_data.get("responseMessage", "Success")
-            }
-        else:
-            error_msg = response_data.get("responseMessage") or response_data.get("errorMessage", "Failed to initiate payment")
-            logger.error(f"[ERCASPAY][ERR] {error_msg}")
-            raise Exception(error_msg)
+        response = requests.post(url, json=payload, headers=_ercaspay_headers(), timeout=30)
+        return _parse_init_response(response.status_code, response.json(), reference)
 
     except Exception as e:
         logger.error(f"[ERCASPAY][EXCEPTION] {str(e)}")
@@ -121,31 +156,106 @@ def verify_ercaspay_transaction(reference: str) -> dict:
     Verify transaction status
     Endpoint: GET /payment/transaction/verify/{reference}
     """
-    base_url = get_ercaspay_base_url()
-    secret_key = get_ercaspay_secret_key()
-    
-    headers = {
-        "Authorization": f"Bearer {secret_key}",
-        "Accept": "application/json",
-    }
+    try:
+        url = f"{get_ercaspay_base_url()}/payment/transaction/verify/{reference}"
+        response = requests.get(url, headers=_ercaspay_headers(json_body=False), timeout=30)
+        return _parse_verify_response(response.status_code, response.json())
+
+    except Exception as e:
+        logger.error(f"[ERCASPAY][VERIFY_EXCEPTION] {str(e)}")
+        raise
+
+
+async def ercaspay_init_payment_async(
+    *,
+    amount: str,
+    currency: str = "NGN",
+    reference: str,
+    customer: dict,
+    redirect_url: str,
+    metadata: dict | None = None,
+    description: str = "Dues Payment",
+    client: httpx.AsyncClient | None = None,
+) -> dict:
+    """
+    Async variant of ercaspay_init_payment() for the ASGI views.
+    Pass a shared `client` to reuse pooled connections.
+    """
+    payload = _init_payment_payload(
+        amount=amount,
+        currency=currency,
+        reference=reference,
+        customer=customer,
+        redirect_url=redirect_url,
+        metadata=metadata,
+        description=description,
+    )
 
     try:
-        url = f"{base_url}/payment/transaction/verify/{reference}"
-        response = requests.get(url, headers=headers, timeout=30)
-        response_data = response.json()
-
-        if response.status_code == 200 and response_data.get("requestSuccessful"):
-             return {
-                "status": True,
-                "data": response_data.get("responseBody", {}),
-                "message": response_data.get("responseMessage", "Success")
-             }
-        
-        return {
-            "status": False,
-            "message": response_data.get("responseMessage", "Verification failed")
-        }
+        url = f"{get_ercaspay_base_url()}/payment/initiate"
+        logger.info(f"[ERCASPAY][REQ] url={url} ref={reference} amount={amount}")
+
+        async with _async_client(client) as http:
+            response = await http.post(url, json=payload, headers=_ercaspay_headers())
+        return _parse_init_response(response.status_code, response.json(), reference)
+
+    except Exception as e:
+        logger.error(f"[ERCASPAY][EXCEPTION] {str(e)}")
+        raise
+
+
+async def verify_ercaspay_transaction_async(
+    reference: str, client: httpx.AsyncClient | None = None
+) -> dict:
+    """
+    Async variant of verify_ercaspay_transaction() for the ASGI views.
+    """
+    try:
+        url = f"{get_ercaspay_base_url()}/payment/transaction/verify/{reference}"
+        async with _async_client(client) as http:
+            response = await http.get(url, headers=_ercaspay_headers(json_body=False))
+        return _parse_verify_response(response.status_code, response.json())
 
     except Exception as e:
         logger.error(f"[ERCASPAY][VERIFY_EXCEPTION] {str(e)}")
         raise
+
+
+@asynccontextmanager
+async def _async_client(client: httpx.AsyncClient | None):
+    """Use the caller's client as-is, or open a short-lived one"""
+    if client is not None:
+        yield client
+        return
+    async with httpx.AsyncClient(timeout=30) as http:
+        yield http
+
+ERCASPAY_SUCCESS_STATUSES = ("success", "successful", "paid")
+
+
+def is_ercaspay_payment_successful(verification_result: dict) -> bool:
+    """
+    Check a verify_ercaspay_transaction() result for a completed payment
+    """
+    if not verification_result or not verification_result.get("status"):
+        return False
+    data = verification_result.get("data") or {}
+    return str(data.get("status", "")).lower() in ERCASPAY_SUCCESS_STATUSES
+
+
+# Payment states Ercaspay reports for a checkout that will never complete
+ERCASPAY_FAILED_STATUSES = ("failed", "abandoned", "cancelled", "expired")
+
+
+def is_ercaspay_payment_failed(verification_result: dict) -> bool:
+    """
+    Check a verify_ercaspay_transaction() result for a checkout that
+    definitely did not pay: an explicit failed/abandoned status, or a 404
+    for an unknown reference. Auth and provider errors are not failures.
+    """
+    if not verification_result:
+        return False
+    if not verification_result.get("status"):
+        return verification_result.get("status_code") == 404
+    data = verification_result.get("data") or {}
+    return str(data.get("status", "")).lower() in ERCASPAY_FAILED_STATUSES
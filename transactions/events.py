@@ -0,0 +1,128 @@
+"""
+Publish/subscribe bus for live transaction dashboard events.
+
+Events are published per association from the transaction lifecycle
+dispatcher (see transactions/signals.py) and consumed by the SSE stream
+endpoint over Redis pub/sub, so they reach clients connected to any worker.
+Both only run with settings.LIVE_STREAM_ENABLED (ASGI workers and REDIS_URL);
+otherwise nothing is published and the stream answers 503.
+"""
+
+import json
+import threading
+
+from django.conf import settings
+from django.db import models
+
+from .models import Transaction
+
+
+def transaction_channel(association_id):
+    return f"transactions:{association_id}"
+
+
+class RedisSubscription:
+    def __init__(self, url, channel):
+        self.url = url
+        self.channel = channel
+        self._async_client = None
+        self._async_pubsub = None
+
+    async def aget(self, timeout):
+        if self._async_pubsub is None:
+            import redis.asyncio
+
+            self._async_client = redis.asyncio.Redis.from_url(self.url)
+            self._async_pubsub = self._async_client.pubsub(
+                ignore_subscribe_messages=True
+            )
+            await self._async_pubsub.subscribe(self.channel)
+        message = await self._async_pubsub.get_message(timeout=timeout)
+        return message["data"].decode("utf-8") if message else None
+
+    async def aclose(self):
+        if self._async_pubsub is not None:
+            await self._async_pubsub.aclose()
+            await self._async_client.aclose()
+
+
+class RedisEventBus:
+    def __init__(self, url):
+        import redis
+
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        self._client.publish(channel, message)
+
+    def has_subscribers(self, channel):
+        # Subscribers may live in other processes; ask Redis
+        return any(count for _, count in self._client.pubsub_numsub(channel))
+
+    def subscribe(self, channel):
+        return RedisSubscription(self.url, channel)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus():
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = RedisEventBus(settings.REDIS_URL)
+    return _bus
+
+
+def has_transaction_subscribers(association_id):
+    """Whether an open stream listens to the association's events"""
+    if not settings.LIVE_STREAM_ENABLED:
+        return False
+    return get_event_bus().has_subscribers(transaction_channel(association_id))
+
+
+def publish_transaction_event(association_id, event, data):
+    """Publish one dashboard event to an association's subscribers"""
+    message = json.dumps({"event": event, "data": data}, default=str)
+    get_event_bus().publish(transaction_channel(association_id), message)
+
+
+def subscribe_transaction_events(association_id):
+    return get_event_bus().subscribe(transaction_channel(association_id))
+
+
+def transaction_payload(txn):
+    """Compact row for a new transaction, as shown on the dashboard list"""
+    return {
+        "id": txn.pk,
+        "reference_id": txn.reference_id,
+        "payer": f"{txn.payer.first_name} {txn.payer.last_name}",
+        "amount_paid": str(txn.amount_paid),
+        "is_verified": txn.is_verified,
+        "session_id": txn.session_id,
+        "submitted_at": txn.submitted_at.isoformat(),
+    }
+
+
+def transaction_totals(queryset):
+    """The TransactionViewSet.list meta counters of `queryset`, in one query"""
+    totals = queryset.order_by().aggregate(
+        total_collections=models.Sum("amount_paid"),
+        completed_payments=models.Count("pk", filter=models.Q(is_verified=True)),
+        pending_payments=models.Count("pk", filter=models.Q(is_verified=False)),
+        total_transactions=models.Count("pk"),
+    )
+    totals["total_collections"] = float(totals["total_collections"] or 0)
+    return totals
+
+
+def session_totals_payload(session_id):
+    """transaction_totals() of a session's unexpired transactions"""
+    totals = transaction_totals(
+        Transaction.objects.filter(session_id=session_id, is_expired=False)
+    )
+    totals["session_id"] = session_id
+    return totals
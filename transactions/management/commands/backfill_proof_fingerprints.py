@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.models import Transaction
+from transactions.proofs import (
+    fetch_proof,
+    find_duplicate_transaction,
+    fingerprint_proof_bytes,
+    flag_possible_duplicates,
+    store_proof_fingerprint,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Hash proofs of payment uploaded before duplicate detection existed: "
+        "download each proof from Cloudinary, store its sha256 and perceptual "
+        "hash, and flag transactions whose proof is the same file as an earlier "
+        "one of their association (or a near-identical image whose OCR "
+        "already matches, as a possible duplicate). Downloads run in "
+        "parallel; flags are assigned in id order so the earliest submission "
+        "is always the original."
+    )
+
+    # Lets callers (and tests) swap the file download via call_command(fetcher=...)
+    stealth_options = ("fetcher",)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Transactions loaded and hashed per batch (default: 100).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Concurrent proof downloads per batch (default: 8).",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-hash every proof, not only those without a sha256.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Hash proofs and report duplicates without writing anything.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        dry_run = options["dry_run"]
+        fetcher = options.get("fetcher") or fetch_proof
+        if batch_size < 1 or workers < 1:
+            raise CommandError("--batch-size and --workers must be positive")
+
+        pending = (
+            Transaction.objects.exclude(proof_of_payment__isnull=True)
+            .exclude(proof_of_payment="")
+            .order_by("pk")
+        )
+        if not options["all"]:
+            pending = pending.filter(proof_sha256="")
+
+        def fingerprint(txn):
+            try:
+                data, content_type = fetcher(txn.proof_of_payment_url)
+                return txn, fingerprint_proof_bytes(data, content_type), None
+            except Exception as e:
+                return txn, None, e
+
+        hashed_total = duplicate_total = failed_total = 0
+        last_pk = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                batch = list(
+                    pending.filter(pk__gt=last_pk).only(
+                        "pk", "reference_id", "association_id", "proof_of_payment"
+                    )[:batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                for txn, result, error in pool.map(fingerprint, batch):
+                    if error is not None:
+                        failed_total += 1
+                        self.stderr.write(f"{txn.reference_id}: {error}")
+                        continue
+                    sha256, phash = result
+                    duplicate_of_id = find_duplicate_transaction(
+                        sha256, txn.association_id, exclude_pk=txn.pk
+                    )
+                    # Only earlier transactions can be the original
+                    if duplicate_of_id is not None and duplicate_of_id > txn.pk:
+                        duplicate_of_id = None
+                    hashed_total += 1
+                    if duplicate_of_id is not None:
+                        duplicate_total += 1
+                        self.stdout.write(
+                            f"{txn.reference_id} duplicates transaction "
+                            f"id={duplicate_of_id}"
+                        )
+                    if dry_run:
+                        continue
+                    Transaction.objects.filter(pk=txn.pk).update(
+                        proof_sha256=sha256, duplicate_of_id=duplicate_of_id
+                    )
+                    store_proof_fingerprint(txn.pk, phash)
+                    flag_possible_duplicates(sha256)
+
+                self.stdout.write(
+                    f"Processed up to id={last_pk}: hashed={hashed_total} "
+                    f"duplicates={duplicate_total}"
+                )
+
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Hashed {hashed_total} proof(s), flagged {duplicate_total} "
+                f"duplicate(s), {failed_total} download error(s)."
+            )
+        )
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transactions.ercaspayServices import (
+    is_ercaspay_payment_failed,
+    is_ercaspay_payment_successful,
+)
+from transactions.models import Transaction
+from transactions.reconciliation import (
+    apply_verified_transactions,
+    pending_ercaspay_transactions,
+    verify_pending_transactions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify stale pending Ercaspay checkouts and mark the ones the provider "
+        "reports as failed, abandoned or unknown as expired, so dashboard "
+        "queries stop scanning them. Manual proof uploads are never expired. "
+        "Safe to run repeatedly (e.g. hourly from a scheduled Fly machine)."
+    )
+
+    # Lets callers (and tests) swap the provider via call_command(verifier=...)
+    stealth_options = ("verifier",)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=24,
+            help="Only consider pending transactions older than this many hours (default: 24).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Number of transactions loaded and verified per batch (default: 200).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Concurrent Ercaspay verification requests per batch (default: 4).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Verify with Ercaspay but do not write any changes.",
+        )
+
+    def handle(self, *args, **options):
+        older_than = options["older_than"]
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        dry_run = options["dry_run"]
+        verifier = options.get("verifier")
+
+        if older_than < 1 or batch_size < 1 or workers < 1:
+            raise CommandError(
+                "--older-than, --batch-size and --workers must be positive"
+            )
+
+        cutoff = timezone.now() - timedelta(hours=older_than)
+        pending = (
+            pending_ercaspay_transactions()
+            .filter(is_expired=False, submitted_at__lt=cutoff)
+            .order_by("pk")
+        )
+
+        expired_total = verified_total = failed_total = 0
+        last_pk = 0
+
+        while True:
+            batch = list(pending.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            expire_ids = []
+            paid = []
+            for txn, result, error in verify_pending_transactions(
+                batch, workers=workers, verifier=verifier
+            ):
+                if error is not None:
+                    # Provider unreachable: leave it for the next run
+                    failed_total += 1
+                elif is_ercaspay_payment_successful(result):
+                    # Paid but the webhook was missed; verify instead of expiring
+                    paid.append(txn)
+                elif is_ercaspay_payment_failed(result):
+                    expire_ids.append(txn.pk)
+                else:
+                    # Still pending, or an auth/provider error: keep it
+                    failed_total += 1
+
+            verified_total += len(paid)
+            expired_total += len(expire_ids)
+            if paid and not dry_run:
+                apply_verified_transactions(paid)
+            if expire_ids and not dry_run:
+                Transaction.objects.filter(
+                    pk__in=expire_ids, is_verified=False
+                ).update(is_expired=True)
+
+            self.stdout.write(
+                f"Processed batch up to id={last_pk}: "
+                f"expired={len(expire_ids)} running_total={expired_total}"
+            )
+
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Expired {expired_total}, verified {verified_total}, "
+                f"skipped {failed_total} (still pending or provider errors)."
+            )
+        )
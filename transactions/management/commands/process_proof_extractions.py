@@ -0,0 +1,124 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.models import ProofExtraction
+from transactions.proofs import (
+    claim_proof_extractions,
+    get_ocr_backend,
+    process_proof_extraction,
+    requeue_stale_extractions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued proof-of-payment OCR jobs with PROOF_OCR_BACKEND. Drains the "
+        "queue and exits, or keeps polling with --loop (e.g. as a Fly worker "
+        "process). Several workers can run at once; each claims its own jobs."
+    )
+
+    # Lets callers (and tests) swap the OCR engine and file download via
+    # call_command(ocr_backend=..., fetcher=...)
+    stealth_options = ("ocr_backend", "fetcher")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Jobs claimed per batch (default: 20).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Concurrent downloads/OCR requests per batch (default: 4).",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=3,
+            help="Mark a job failed after this many errors (default: 3).",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=900,
+            help="Requeue jobs left processing for this many seconds, e.g. by a "
+            "killed worker (default: 900).",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Requeue failed jobs before starting.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new jobs instead of exiting when idle.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds between polls of an empty queue with --loop (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        max_attempts = options["max_attempts"]
+        if batch_size < 1 or workers < 1 or max_attempts < 1:
+            raise CommandError(
+                "--batch-size, --workers and --max-attempts must be positive"
+            )
+
+        backend = options.get("ocr_backend") or get_ocr_backend()
+        fetcher = options.get("fetcher")
+
+        if options["retry_failed"]:
+            retried = ProofExtraction.objects.filter(
+                status=ProofExtraction.FAILED
+            ).update(status=ProofExtraction.PENDING, attempts=0)
+            self.stdout.write(f"Requeued {retried} failed job(s)")
+
+        done_total = failed_total = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                requeued = requeue_stale_extractions(options["stale_after"])
+                if requeued:
+                    self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+                batch = claim_proof_extractions(batch_size)
+                if not batch:
+                    if not options["loop"]:
+                        break
+                    time.sleep(options["interval"])
+                    continue
+
+                for extraction in pool.map(
+                    lambda extraction: process_proof_extraction(
+                        extraction,
+                        backend=backend,
+                        fetcher=fetcher,
+                        max_attempts=max_attempts,
+                    ),
+                    batch,
+                ):
+                    if extraction.status == ProofExtraction.DONE:
+                        done_total += 1
+                    elif extraction.status == ProofExtraction.FAILED:
+                        failed_total += 1
+
+                self.stdout.write(
+                    f"Processed {len(batch)} job(s): done={done_total} "
+                    f"failed={failed_total}"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Extracted {done_total} proof(s), {failed_total} failed."
+            )
+        )
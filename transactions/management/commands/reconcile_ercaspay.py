@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transactions.ercaspayServices import is_ercaspay_payment_successful
+from transactions.reconciliation import (
+    apply_verified_transactions,
+    pending_ercaspay_transactions,
+    provider_amount,
+    verify_pending_transactions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconcile pending Ercaspay checkouts in a time window against Ercaspay "
+        "and apply missed webhook verifications in bulk. Manual proof uploads "
+        "are left for admin review. Intended to run as a cron "
+        "job, e.g. `fly machine run . --schedule hourly "
+        "--command 'python manage.py reconcile_ercaspay'`."
+    )
+
+    # Lets callers (and tests) swap the provider via call_command(verifier=...)
+    stealth_options = ("verifier",)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=72,
+            help="Look back this many hours for pending transactions (default: 72).",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=10,
+            help="Skip transactions younger than this many minutes, "
+            "as the payer may still be on the checkout page (default: 10).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Size of the verification thread pool (default: 4).",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=5.0,
+            help="Maximum Ercaspay requests per second across all workers; "
+            "0 disables the limit (default: 5).",
+        )
+        parser.add_argument(
+            "--include-expired",
+            action="store_true",
+            help="Also re-check transactions already marked as expired.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the report without writing any changes.",
+        )
+
+    def handle(self, *args, **options):
+        hours = options["hours"]
+        min_age = options["min_age"]
+        workers = options["workers"]
+        rate = options["rate"]
+        dry_run = options["dry_run"]
+        verifier = options.get("verifier")
+
+        if hours < 1 or workers < 1 or min_age < 0 or rate < 0:
+            raise CommandError("Invalid window, worker or rate settings")
+
+        now = timezone.now()
+        pending = pending_ercaspay_transactions().filter(
+            submitted_at__gte=now - timedelta(hours=hours),
+            submitted_at__lte=now - timedelta(minutes=min_age),
+        )
+        if not options["include_expired"]:
+            pending = pending.filter(is_expired=False)
+        pending = list(pending.order_by("submitted_at"))
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"== Reconciling {len(pending)} pending transaction(s) =="
+            )
+        )
+
+        fixed, still_pending, mismatched, errored = [], [], [], []
+        for txn, result, error in verify_pending_transactions(
+            pending, workers=workers, verifier=verifier, rate_limit=rate
+        ):
+            if error is not None:
+                errored.append((txn, str(error)))
+            elif not is_ercaspay_payment_successful(result):
+                still_pending.append(txn)
+            else:
+                amount = provider_amount(result)
+                if amount is not None and amount < txn.amount_paid:
+                    mismatched.append((txn, amount))
+                else:
+                    fixed.append(txn)
+
+        if fixed and not dry_run:
+            apply_verified_transactions(fixed)
+
+        self._report(fixed, still_pending, mismatched, errored, dry_run)
+
+    def _report(self, fixed, still_pending, mismatched, errored, dry_run):
+        prefix = "[dry-run] " if dry_run else ""
+
+        self.stdout.write(self.style.SUCCESS(f"{prefix}Fixed: {len(fixed)}"))
+        for txn in fixed:
+            self.stdout.write(f"  {txn.reference_id} amount={txn.amount_paid}")
+
+        self.stdout.write(f"Still pending: {len(still_pending)}")
+        for txn in still_pending:
+            self.stdout.write(f"  {txn.reference_id} submitted_at={txn.submitted_at}")
+
+        style = self.style.ERROR if mismatched else self.style.SUCCESS
+        self.stdout.write(style(f"Mismatched amount: {len(mismatched)}"))
+        for txn, amount in mismatched:
+            self.stdout.write(
+                f"  {txn.reference_id} expected={txn.amount_paid} provider={amount}"
+            )
+
+        if errored:
+            self.stdout.write(self.style.WARNING(f"Provider errors: {len(errored)}"))
+            for txn, message in errored:
+                self.stdout.write(f"  {txn.reference_id} error={message}")
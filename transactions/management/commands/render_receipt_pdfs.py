@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.models import TransactionReceipt
+from transactions.pdf import prune_receipt_pdfs, render_receipt_pdfs
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render receipt PDFs into the content-addressed cache using a "
+        "process pool. Receipts whose content is unchanged are skipped. With "
+        "--prune, cached files for outdated content are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--session",
+            type=int,
+            help="Only render receipts for transactions in this session id.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Render processes (default: number of CPUs).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Receipts loaded per query (default: 500).",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete cached PDFs no current receipt content hashes to. "
+            "Needs every receipt, so it cannot be combined with --session.",
+        )
+
+    def handle(self, *args, **options):
+        if options["prune"] and options["session"]:
+            raise CommandError("--prune needs every receipt; drop --session")
+
+        receipts = TransactionReceipt.objects.select_related(
+            "transaction__payer", "transaction__association", "transaction__session"
+        ).order_by("pk")
+        if options["session"]:
+            receipts = receipts.filter(transaction__session_id=options["session"])
+
+        chunk_size = options["chunk_size"]
+        total = 0
+        last_pk = 0
+        current_hashes = set()
+        while True:
+            chunk = list(
+                receipts.filter(pk__gt=last_pk).prefetch_related(
+                    "transaction__payment_items"
+                )[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            current_hashes.update(
+                render_receipt_pdfs(chunk, workers=options["workers"]).values()
+            )
+            total += len(chunk)
+            self.stdout.write(f"Rendered up to receipt id={last_pk} ({total} total)")
+
+        self.stdout.write(self.style.SUCCESS(f"Done. {total} receipt(s) checked."))
+        if options["prune"]:
+            removed = prune_receipt_pdfs(current_hashes)
+            self.stdout.write(
+                self.style.SUCCESS(f"Pruned {removed} outdated PDF file(s).")
+            )
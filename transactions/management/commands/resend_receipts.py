@@ -0,0 +1,174 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transactions.emails import build_receipt_email
+from transactions.models import TransactionReceipt
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render and resend receipt emails in bulk, e.g. after an association "
+        "changes its name or logo or after an email outage. Receipts are sent in "
+        "id order through a single mail connection; rerun with --resume-from (or "
+        "--checkpoint) to continue an interrupted run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--association", type=int, help="Only receipts for this association id."
+        )
+        parser.add_argument(
+            "--session", type=int, help="Only receipts for this session id."
+        )
+        parser.add_argument(
+            "--since",
+            help="Only receipts issued on or after this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--until",
+            help="Only receipts issued on or before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--refs",
+            help="Comma-separated transaction reference ids to resend.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Receipts loaded, rendered and sent per batch (default: 100).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Threads rendering emails per batch (default: 4).",
+        )
+        parser.add_argument(
+            "--resume-from",
+            type=int,
+            default=0,
+            help="Skip receipts with an id up to and including this one.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="File storing the last sent receipt id. Read on start (unless "
+            "--resume-from is given) and updated after every batch.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Render the emails and report counts without sending anything.",
+        )
+
+    def _parse_date(self, value, option, end_of_day=False):
+        try:
+            day = datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"{option} must be a date in YYYY-MM-DD format")
+        return timezone.make_aware(
+            datetime.combine(day, time.max if end_of_day else time.min)
+        )
+
+    def _read_checkpoint(self, path):
+        try:
+            with open(path) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            raise CommandError(f"Checkpoint file {path} does not contain a receipt id")
+
+    def _write_checkpoint(self, path, last_pk):
+        with open(path, "w") as f:
+            f.write(str(last_pk))
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        dry_run = options["dry_run"]
+        checkpoint = options["checkpoint"]
+
+        if batch_size < 1 or workers < 1:
+            raise CommandError("--batch-size and --workers must be positive")
+
+        receipts = TransactionReceipt.objects.select_related(
+            "transaction__payer",
+            "transaction__session",
+            "transaction__association__admin",
+        ).order_by("pk")
+        if options["association"]:
+            receipts = receipts.filter(
+                transaction__association_id=options["association"]
+            )
+        if options["session"]:
+            receipts = receipts.filter(transaction__session_id=options["session"])
+        if options["since"]:
+            receipts = receipts.filter(
+                issued_at__gte=self._parse_date(options["since"], "--since")
+            )
+        if options["until"]:
+            receipts = receipts.filter(
+                issued_at__lte=self._parse_date(
+                    options["until"], "--until", end_of_day=True
+                )
+            )
+        if options["refs"]:
+            refs = [ref.strip() for ref in options["refs"].split(",") if ref.strip()]
+            receipts = receipts.filter(transaction__reference_id__in=refs)
+
+        last_pk = options["resume_from"]
+        if not last_pk and checkpoint:
+            last_pk = self._read_checkpoint(checkpoint)
+        if last_pk:
+            receipts = receipts.filter(pk__gt=last_pk)
+            self.stdout.write(f"Resuming after receipt id={last_pk}")
+
+        total = receipts.count()
+        sent_total = 0
+        connection = None if dry_run else get_connection(fail_silently=False)
+
+        try:
+            if connection is not None:
+                connection.open()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                while True:
+                    batch = list(receipts.filter(pk__gt=last_pk)[:batch_size])
+                    if not batch:
+                        break
+
+                    messages = list(
+                        pool.map(
+                            lambda receipt: build_receipt_email(
+                                receipt, connection=connection
+                            ),
+                            batch,
+                        )
+                    )
+                    if not dry_run:
+                        try:
+                            connection.send_messages(messages)
+                        except Exception as e:
+                            raise CommandError(
+                                f"Sending failed after receipt id={last_pk}: {e}. "
+                                f"Rerun with --resume-from {last_pk} to continue."
+                            )
+
+                    last_pk = batch[-1].pk
+                    sent_total += len(messages)
+                    if checkpoint and not dry_run:
+                        self._write_checkpoint(checkpoint, last_pk)
+                    self.stdout.write(
+                        f"Processed up to receipt id={last_pk}: "
+                        f"{sent_total}/{total}"
+                    )
+        finally:
+            if connection is not None:
+                connection.close()
+
+        prefix = "[dry-run] Rendered" if dry_run else "Resent"
+        self.stdout.write(self.style.SUCCESS(f"{prefix} {sent_total} receipt(s)."))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("association", "0002_initial"),
+        ("payers", "0001_initial"),
+        ("payments", "0001_initial"),
+        ("transactions", "0002_transaction_payment_provider_reference"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="is_expired",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("is_expired", False)),
+                fields=["session", "-submitted_at"],
+                name="txn_live_session_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0003_transaction_is_expired"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="proof_sha256",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.CreateModel(
+            name="ProofExtraction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sha256", models.CharField(max_length=64, unique=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("source_url", models.URLField(blank=True, max_length=500)),
+                ("content_type", models.CharField(blank=True, max_length=100)),
+                ("text", models.TextField(blank=True)),
+                ("amounts", models.JSONField(blank=True, default=list)),
+                ("receipt_date", models.DateField(blank=True, null=True)),
+                ("backend", models.CharField(blank=True, max_length=200)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "pending")),
+                        fields=["created_at"],
+                        name="proof_extraction_queue_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0004_proof_extraction"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="transactions.transaction",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ProofFingerprint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("phash", models.BigIntegerField()),
+                ("band_0", models.PositiveIntegerField(db_index=True)),
+                ("band_1", models.PositiveIntegerField(db_index=True)),
+                ("band_2", models.PositiveIntegerField(db_index=True)),
+                ("band_3", models.PositiveIntegerField(db_index=True)),
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="proof_fingerprint",
+                        to="transactions.transaction",
+                    ),
+                ),
+            ],
+        ),
+    ]
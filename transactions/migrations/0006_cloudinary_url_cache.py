@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:13
+
+from django.db import migrations, models
+
+from utils.media import PROOF_THUMBNAIL, cloudinary_urls
+
+
+def backfill_proof_urls(apps, schema_editor):
+    Transaction = apps.get_model("transactions", "Transaction")
+    batch = []
+    for txn in (
+        Transaction.objects.exclude(proof_of_payment__isnull=True)
+        .exclude(proof_of_payment="")
+        .only("pk", "proof_of_payment")
+        .iterator(chunk_size=1000)
+    ):
+        txn.proof_cdn_url, txn.proof_thumbnail_url = cloudinary_urls(
+            txn.proof_of_payment, PROOF_THUMBNAIL
+        )
+        batch.append(txn)
+        if len(batch) == 1000:
+            Transaction.objects.bulk_update(
+                batch, ["proof_cdn_url", "proof_thumbnail_url"]
+            )
+            batch = []
+    if batch:
+        Transaction.objects.bulk_update(batch, ["proof_cdn_url", "proof_thumbnail_url"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0005_proof_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="proof_cdn_url",
+            field=models.URLField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="proof_thumbnail_url",
+            field=models.URLField(blank=True, max_length=500),
+        ),
+        migrations.RunPython(backfill_proof_urls, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("association", "0004_cloudinary_url_cache"),
+        ("payers", "0002_ledger_indexes"),
+        ("payments", "0002_payment_item_level_mask"),
+        ("transactions", "0006_cloudinary_url_cache"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("is_verified", True)),
+                fields=["payer"],
+                name="txn_verified_payer_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0007_ledger_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="possible_duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="possible_duplicates",
+                to="transactions.transaction",
+            ),
+        ),
+    ]
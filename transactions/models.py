@@ -1,11 +1,16 @@
 import uuid
 
 from cloudinary.models import CloudinaryField
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
 from django.db import models
+from django.urls import reverse
 
 from association.models import Association, Session
 from payers.models import Payer
 from payments.models import PaymentItem
+from utils.media import PROOF_THUMBNAIL, refresh_cloudinary_urls
+from utils.uploads import downsample_image
 from utils.utils import validate_file_type
 
 from .utils import generate_unique_reference_id
@@ -33,11 +38,63 @@ class Transaction(models.Model):
         blank=True,
         null=True,
     )  # made optional
+    # sha256 of the uploaded proof; keys its cached ProofExtraction
+    proof_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    # Delivery URLs of the proof, refreshed on upload (see utils.media)
+    proof_cdn_url = models.URLField(max_length=500, blank=True)
+    proof_thumbnail_url = models.URLField(max_length=500, blank=True)
     is_verified = models.BooleanField(default=False)
+    # Set by `expire_pending_transactions` for abandoned checkouts
+    is_expired = models.BooleanField(default=False)
     submitted_at = models.DateTimeField(auto_now_add=True)
     session = models.ForeignKey(
         Session, on_delete=models.CASCADE, related_name="transactions"
     )
+    # Earlier transaction of the association whose proof is the same file
+    # (see transactions.proofs.find_duplicate_transaction)
+    duplicate_of = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="duplicates",
+    )
+    # Earlier transaction with a near-identical image whose OCR'd reference
+    # or amount and date also match; for admin review, not proof of reuse
+    # (see transactions.proofs.flag_possible_duplicates)
+    possible_duplicate_of = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="possible_duplicates",
+    )
+
+    class Meta:
+        indexes = [
+            # Dashboard queries only ever look at live (non-expired) rows
+            models.Index(
+                fields=["session", "-submitted_at"],
+                condition=models.Q(is_expired=False),
+                name="txn_live_session_idx",
+            ),
+            # "Has this payer paid item X" probes of the dues ledger
+            models.Index(
+                fields=["payer"],
+                condition=models.Q(is_verified=True),
+                name="txn_verified_payer_idx",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored verification state so the lifecycle dispatcher
+        # (transactions.signals) only acts on a real False -> True flip
+        instance._loaded_is_verified = dict(zip(field_names, values)).get(
+            "is_verified", False
+        )
+        return instance
 
     def save(self, *args, **kwargs):
         if not self.reference_id:
@@ -46,14 +103,113 @@ class Transaction(models.Model):
                 if not Transaction.objects.filter(reference_id=ref).exists():
                     self.reference_id = ref
                     break
+        # A fresh upload (CloudinaryField stores it in pre_save): downsample
+        # and fingerprint it while it is still local, flag it if the proof was
+        # seen before, and let the lifecycle dispatcher queue its OCR
+        uploaded = isinstance(self.proof_of_payment, UploadedFile)
+        if uploaded:
+            from .proofs import find_duplicate_transaction, fingerprint_proof_file
+
+            # Stored and OCR'd at a bounded resolution
+            self.proof_of_payment = downsample_image(self.proof_of_payment)
+            self.proof_sha256, phash = fingerprint_proof_file(self.proof_of_payment)
+            self.duplicate_of_id = find_duplicate_transaction(
+                self.proof_sha256, self.association_id, exclude_pk=self.pk
+            )
+            # Re-checked against the new proof once its OCR is done
+            self.possible_duplicate_of_id = None
+            self._proof_uploaded = True
+        changed = refresh_cloudinary_urls(
+            self,
+            "proof_of_payment",
+            "proof_cdn_url",
+            "proof_thumbnail_url",
+            PROOF_THUMBNAIL,
+        )
+        if changed and kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], *changed}
         super().save(*args, **kwargs)
+        if uploaded:
+            from .proofs import store_proof_fingerprint
+
+            store_proof_fingerprint(self.pk, phash)
 
     def __str__(self):
         return f"Transaction {self.reference_id} by {self.payer}"
 
     @property
     def proof_of_payment_url(self):
-        return self.proof_of_payment.url if self.proof_of_payment else ""
+        if self.proof_cdn_url or not self.proof_of_payment:
+            return self.proof_cdn_url
+        return self.proof_of_payment.url
+
+
+class ProofExtraction(models.Model):
+    """
+    OCR result for one proof-of-payment file, keyed by the file's sha256 so a
+    proof uploaded twice is only read once. Rows double as the job queue for
+    `process_proof_extractions`.
+    """
+
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (PROCESSING, "Processing"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    source_url = models.URLField(max_length=500, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    text = models.TextField(blank=True)
+    # Whole-naira amounts found in the text, as strings (e.g. ["2000"])
+    amounts = models.JSONField(default=list, blank=True)
+    receipt_date = models.DateField(blank=True, null=True)
+    backend = models.CharField(max_length=200, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The worker only ever scans the queue head
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(status="pending"),
+                name="proof_extraction_queue_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Proof {self.sha256[:12]} ({self.status})"
+
+
+class ProofFingerprint(models.Model):
+    """
+    Perceptual hash of an image proof, split into four 16-bit bands. Two
+    64-bit hashes within Hamming distance 7 have a band that differs by at
+    most one bit, so near-duplicate candidates are found with indexed IN
+    lookups (see transactions.proofs.near_duplicate_candidates).
+    """
+
+    transaction = models.OneToOneField(
+        Transaction, on_delete=models.CASCADE, related_name="proof_fingerprint"
+    )
+    # 64-bit dHash, stored signed to fit a bigint column
+    phash = models.BigIntegerField()
+    band_0 = models.PositiveIntegerField(db_index=True)
+    band_1 = models.PositiveIntegerField(db_index=True)
+    band_2 = models.PositiveIntegerField(db_index=True)
+    band_3 = models.PositiveIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"Fingerprint {self.phash & 0xFFFFFFFFFFFFFFFF:016x} for {self.transaction_id}"
 
 
 # Transaction Receipt model
@@ -114,4 +270,6 @@ class TransactionReceipt(models.Model):
 
     @property
     def pdf_file_url(self):
-        return self.pdf_file.url if self.pdf_file else ""
+        """Backend URL of the generated PDF (rendered and cached on first request)"""
+        path = reverse("receipt-pdf", kwargs={"receipt_id": self.receipt_id})
+        return f"{getattr(settings, 'BACKEND_URL', '').rstrip('/')}{path}"
@@ -0,0 +1,233 @@
+"""
+Server-side PDF receipts.
+
+PDFs are cached on disk under a hash of the receipt content, so a receipt is
+rendered once and re-rendered only when something printed on it changes (for
+example the association name). render_receipt_pdf() is a pure function of the
+content dict so bulk rendering can fan out to a process pool.
+
+Files are written under a temporary name and linked into place only if the
+final name is still free, so concurrent renders never leave suffixed copies.
+Files for outdated content are removed by `render_receipt_pdfs --prune`.
+"""
+
+import hashlib
+import io
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+# Bump when the PDF layout changes so cached files are regenerated
+PDF_LAYOUT_VERSION = 1
+
+
+def receipt_pdf_storage():
+    return FileSystemStorage(location=settings.RECEIPT_PDF_CACHE_DIR)
+
+
+def receipt_public_url(receipt):
+    return f"{settings.FRONTEND_URL}/transactions/receipt/{receipt.receipt_id}/"
+
+
+def receipt_pdf_content(receipt):
+    """Everything printed on the PDF, as plain JSON-serialisable values"""
+    transaction = receipt.transaction
+    association = transaction.association
+    payer = transaction.payer
+    return {
+        "layout": PDF_LAYOUT_VERSION,
+        "receipt_id": str(receipt.receipt_id),
+        "receipt_no": (
+            f"{association.association_short_name.upper()}/"
+            f"{receipt.receipt_no}/{receipt.issued_at.strftime('%y')}"
+        ),
+        "issued_at": receipt.issued_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "association_name": association.association_name,
+        "theme_color": association.theme_color,
+        "session_title": transaction.session.title if transaction.session else "N/A",
+        "payer_name": f"{payer.first_name} {payer.last_name}",
+        "payer_level": payer.level,
+        "payer_matric": payer.matric_number,
+        "transaction_ref": transaction.reference_id,
+        "amount_paid": f"{transaction.amount_paid:,.2f}",
+        "items": [
+            [item.title, f"{item.amount:,.2f}"]
+            for item in transaction.payment_items.all()
+        ],
+        "receipt_url": receipt_public_url(receipt),
+    }
+
+
+def receipt_content_hash(content):
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def receipt_pdf_name(content_hash):
+    return f"{content_hash}.pdf"
+
+
+def store_receipt_pdf(storage, name, pdf_bytes):
+    """
+    Write `name` unless it already exists. The bytes go to a temporary file
+    that is hard-linked to the final name, which fails if another process
+    got there first; identical content means either copy will do.
+    """
+    os.makedirs(storage.location, exist_ok=True)
+    temp_path = storage.path(f".{name}.{uuid.uuid4().hex}.tmp")
+    with open(temp_path, "wb") as temp_file:
+        temp_file.write(pdf_bytes)
+    try:
+        os.link(temp_path, storage.path(name))
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(temp_path)
+
+
+def prune_receipt_pdfs(current_hashes, temp_max_age=60 * 60):
+    """
+    Delete cached PDFs whose content hash is not in `current_hashes`, plus
+    temporary files older than `temp_max_age` seconds left by killed
+    renders. Returns the number of files removed.
+    """
+    storage = receipt_pdf_storage()
+    if not os.path.isdir(storage.location):
+        return 0
+    keep = {receipt_pdf_name(content_hash) for content_hash in current_hashes}
+    removed = 0
+    for name in storage.listdir("")[1]:
+        if name.endswith(".tmp"):
+            stale = time.time() - os.path.getmtime(storage.path(name)) > temp_max_age
+        else:
+            stale = name.endswith(".pdf") and name not in keep
+        if stale:
+            storage.delete(name)
+            removed += 1
+    return removed
+
+
+def render_receipt_pdf(content):
+    """Render the receipt PDF bytes for a receipt_pdf_content() dict"""
+    import qrcode
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A5
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    width, height = A5
+    # invariant=1 keeps the output byte-identical for identical content
+    pdf = canvas.Canvas(buffer, pagesize=A5, invariant=1)
+    pdf.setTitle(f"Receipt {content['receipt_no']}")
+
+    try:
+        theme = colors.HexColor(content["theme_color"])
+    except (ValueError, TypeError):
+        theme = colors.HexColor("#0f172a")
+
+    # Header band
+    pdf.setFillColor(theme)
+    pdf.rect(0, height - 30 * mm, width, 30 * mm, stroke=0, fill=1)
+    pdf.setFillColor(colors.white)
+    pdf.setFont("Helvetica-Bold", 14)
+    pdf.drawString(12 * mm, height - 14 * mm, content["association_name"][:48])
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(12 * mm, height - 21 * mm, "Payment Receipt")
+
+    # Details
+    pdf.setFillColor(colors.black)
+    y = height - 42 * mm
+    rows = [
+        ("Receipt No", content["receipt_no"]),
+        ("Issued", content["issued_at"]),
+        ("Session", content["session_title"]),
+        ("Payer", content["payer_name"]),
+        ("Matric No", content["payer_matric"]),
+        ("Level", content["payer_level"]),
+        ("Reference", content["transaction_ref"]),
+    ]
+    for label, value in rows:
+        pdf.setFont("Helvetica", 9)
+        pdf.drawString(12 * mm, y, label)
+        pdf.setFont("Helvetica-Bold", 9)
+        pdf.drawString(45 * mm, y, str(value))
+        y -= 6 * mm
+
+    # Items
+    y -= 3 * mm
+    pdf.setStrokeColor(colors.lightgrey)
+    pdf.line(12 * mm, y + 3 * mm, width - 12 * mm, y + 3 * mm)
+    pdf.setFont("Helvetica", 9)
+    for title, amount in content["items"]:
+        pdf.drawString(12 * mm, y - 2 * mm, title[:50])
+        pdf.drawRightString(width - 12 * mm, y - 2 * mm, f"NGN {amount}")
+        y -= 6 * mm
+    pdf.line(12 * mm, y + 1 * mm, width - 12 * mm, y + 1 * mm)
+    pdf.setFont("Helvetica-Bold", 11)
+    pdf.drawString(12 * mm, y - 5 * mm, "Total Paid")
+    pdf.drawRightString(width - 12 * mm, y - 5 * mm, f"NGN {content['amount_paid']}")
+
+    # QR code linking to the online receipt
+    qr_image = qrcode.make(content["receipt_url"], box_size=4, border=1)
+    qr_size = 28 * mm
+    pdf.drawImage(
+        ImageReader(qr_image.get_image()),
+        width - 12 * mm - qr_size,
+        14 * mm,
+        qr_size,
+        qr_size,
+    )
+    pdf.setFont("Helvetica", 7)
+    pdf.setFillColor(colors.grey)
+    pdf.drawString(12 * mm, 14 * mm, f"Receipt ID: {content['receipt_id']}")
+    pdf.drawString(12 * mm, 10 * mm, "Scan the code to verify this receipt. Powered by DuesPay")
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def get_or_render_receipt_pdf(receipt):
+    """
+    Return (content_hash, storage_name) for a receipt's PDF, rendering and
+    storing it only if no file exists for the current content.
+    """
+    content = receipt_pdf_content(receipt)
+    content_hash = receipt_content_hash(content)
+    name = receipt_pdf_name(content_hash)
+    storage = receipt_pdf_storage()
+    if not storage.exists(name):
+        store_receipt_pdf(storage, name, render_receipt_pdf(content))
+    return content_hash, name
+
+
+def render_receipt_pdfs(receipts, workers=None):
+    """
+    Bulk variant of get_or_render_receipt_pdf(). Content is collected in this
+    process (it needs the ORM); only missing PDFs are rendered, in a process
+    pool. Returns {receipt_id: content_hash}.
+    """
+    storage = receipt_pdf_storage()
+    hashes = {}
+    missing = {}
+    for receipt in receipts:
+        content = receipt_pdf_content(receipt)
+        content_hash = receipt_content_hash(content)
+        hashes[str(receipt.receipt_id)] = content_hash
+        if not storage.exists(receipt_pdf_name(content_hash)):
+            missing[content_hash] = content
+
+    if missing:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = pool.map(render_receipt_pdf, missing.values())
+            for content_hash, pdf_bytes in zip(missing.keys(), rendered):
+                store_receipt_pdf(storage, receipt_pdf_name(content_hash), pdf_bytes)
+
+    return hashes
@@ -0,0 +1,464 @@
+"""
+Proof-of-payment OCR pipeline.
+
+Uploads are hashed (sha256) when a transaction is saved and an OCR job is
+queued as a ProofExtraction row once it commits; `process_proof_extractions`
+works through the queue in the background, so checkout never waits on the
+OCR model. Extractions are keyed by the file hash, so a proof uploaded twice
+is read once.
+
+The OCR engine is PROOF_OCR_BACKEND: Gemini in production, or
+LocalOCRBackend as an offline stand-in for development and tests.
+
+A proof file resubmitted within the same association is flagged as
+Transaction.duplicate_of at upload time. Image proofs also get a perceptual
+hash (ProofFingerprint); a near-identical image is only flagged, as
+Transaction.possible_duplicate_of, once OCR shows the same reference or the
+same amounts and date.
+"""
+
+import hashlib
+import io
+import logging
+import mimetypes
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import requests
+from decouple import config
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from utils.uploads import downsample_image, sniff_file
+
+from .models import ProofExtraction, ProofFingerprint, Transaction
+
+logger = logging.getLogger(__name__)
+
+OCR_PROMPT = (
+    "Extract all visible text from this document/image. "
+    "Provide the text as plain, unformatted content."
+)
+GEMINI_MODEL = "gemini-2.0-flash"
+FETCH_TIMEOUT = 30
+
+# dHash grid: 8x8 horizontal gradients -> 64-bit hash
+DHASH_SIZE = 8
+# Hashes this close are the same image or the same screen layout: receipts
+# from one banking app hash alike whatever the amount or name, so a near
+# match alone never flags anything (see flag_possible_duplicates). The band
+# lookup finds every match up to 2 * PHASH_BANDS - 1 bits
+NEAR_DUPLICATE_DISTANCE = 6
+PHASH_BANDS = 4
+PHASH_BAND_BITS = 16
+
+# OCR commonly reads 0 as O; the naira sign (or N) prefixes amounts
+_amount_translation = str.maketrans({"O": "0", "o": "0", "₦": None, "N": None})
+re_amount = re.compile(r"\d[\d,.]*")
+re_plain_number = re.compile(r"\d+(?:\.\d+)?")
+re_iso_date = re.compile(r"(\d{4}-\d{2}-\d{2})")
+re_printable_run = re.compile(r"[^\x00-\x08\x0b-\x1f\x7f-\x9f]{4,}")
+# Transfer references / session ids: 12+ letters and digits, 6+ of them
+# digits. Shorter runs are mostly account (10) and phone (11) numbers, which
+# repeat across one payer's receipts
+re_reference = re.compile(r"\b(?=(?:[A-Za-z]*\d){6})[A-Za-z0-9]{12,}\b")
+
+
+def hash_proof_file(file):
+    """sha256 hex digest of an uploaded file, read in chunks"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    # Leave the file ready for the storage upload that follows
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def image_dhash(file):
+    """64-bit difference hash of an image file, or None if it is not an image"""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(file) as image:
+            # Let JPEG decode at reduced size; only a 9x8 thumbnail is needed
+            image.draft("L", (DHASH_SIZE * 8, DHASH_SIZE * 8))
+            pixels = list(
+                image.convert("L")
+                .resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.LANCZOS)
+                .getdata()
+            )
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+
+    value = 0
+    for row in range(DHASH_SIZE):
+        for col in range(DHASH_SIZE):
+            left = pixels[row * (DHASH_SIZE + 1) + col]
+            right = pixels[row * (DHASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    # Stored in a signed bigint column
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def phash_bands(phash):
+    unsigned = phash & 0xFFFFFFFFFFFFFFFF
+    mask = (1 << PHASH_BAND_BITS) - 1
+    return [
+        (unsigned >> (PHASH_BAND_BITS * band)) & mask for band in range(PHASH_BANDS)
+    ]
+
+
+def band_neighbours(value):
+    """A band value and every value one bit away from it"""
+    return [value] + [value ^ (1 << bit) for bit in range(PHASH_BAND_BITS)]
+
+
+def hamming_distance(a, b):
+    return ((a ^ b) & 0xFFFFFFFFFFFFFFFF).bit_count()
+
+
+def fingerprint_proof_bytes(data, content_type):
+    """(sha256, dHash or None) of a proof's bytes"""
+    sha256 = hashlib.sha256(data).hexdigest()
+    phash = image_dhash(io.BytesIO(data)) if content_type.startswith("image/") else None
+    return sha256, phash
+
+
+def fingerprint_proof_file(file):
+    """(sha256, dHash or None) of an uploaded proof, reading it once in chunks"""
+    sha256 = hash_proof_file(file)
+    content_type = sniff_file(file) or guess_content_type(getattr(file, "name", ""))
+    phash = None
+    if content_type.startswith("image/"):
+        phash = image_dhash(file)
+        file.seek(0)
+    return sha256, phash
+
+
+def find_duplicate_transaction(sha256, association_id, exclude_pk=None):
+    """
+    Id of the earliest other transaction of the association whose proof is
+    the same file, or None.
+    """
+    exact = Transaction.objects.filter(
+        proof_sha256=sha256, association_id=association_id
+    )
+    if exclude_pk is not None:
+        exact = exact.exclude(pk=exclude_pk)
+    return exact.order_by("pk").values_list("pk", flat=True).first()
+
+
+def near_duplicate_candidates(phash, association_id, exclude_pk=None):
+    """
+    Ids (ascending) of the association's other transactions whose image
+    proof is within NEAR_DUPLICATE_DISTANCE of `phash`.
+    """
+    # Two hashes within 2 * PHASH_BANDS - 1 bits differ by at most one bit
+    # in at least one band, so probing each band's one-bit neighbourhood on
+    # the band indexes finds every candidate
+    band_match = models.Q()
+    for band, value in enumerate(phash_bands(phash)):
+        band_match |= models.Q(**{f"band_{band}__in": band_neighbours(value)})
+    candidates = ProofFingerprint.objects.filter(
+        band_match, transaction__association_id=association_id
+    )
+    if exclude_pk is not None:
+        candidates = candidates.exclude(transaction_id=exclude_pk)
+    return sorted(
+        transaction_id
+        for transaction_id, candidate_phash in candidates.values_list(
+            "transaction_id", "phash"
+        )
+        if hamming_distance(phash, candidate_phash) <= NEAR_DUPLICATE_DISTANCE
+    )
+
+
+def extract_references(text):
+    """Reference-like tokens (upper-cased) found in OCR text"""
+    return {token.upper() for token in re_reference.findall(text or "")}
+
+
+def extractions_match(a, b):
+    """
+    Whether two finished ProofExtractions read as the same payment: a shared
+    transfer reference, or else the same amounts and receipt date.
+    """
+    if extract_references(a.text) & extract_references(b.text):
+        return True
+    return bool(
+        a.amounts
+        and a.receipt_date
+        and sorted(a.amounts) == sorted(b.amounts)
+        and a.receipt_date == b.receipt_date
+    )
+
+
+def flag_possible_duplicates(sha256):
+    """
+    Once the OCR of proof `sha256` is done, set possible_duplicate_of on
+    each transaction with that proof (and on later near-identical ones)
+    whose earliest near-identical predecessor also reads as the same
+    payment. Exact copies are already flagged by duplicate_of.
+    """
+    if not ProofExtraction.objects.filter(
+        sha256=sha256, status=ProofExtraction.DONE
+    ).exists():
+        return 0
+    fingerprints = ProofFingerprint.objects.filter(
+        transaction__proof_sha256=sha256
+    ).values_list("transaction_id", "transaction__association_id", "phash")
+
+    checks = {}
+    for transaction_id, association_id, phash in fingerprints:
+        near = near_duplicate_candidates(phash, association_id, transaction_id)
+        # This transaction against earlier ones, and later ones against it
+        checks[transaction_id] = [pk for pk in near if pk < transaction_id]
+        for later_id in near:
+            if later_id > transaction_id:
+                checks.setdefault(later_id, []).append(transaction_id)
+    if not checks:
+        return 0
+
+    involved = set(checks) | {pk for earlier in checks.values() for pk in earlier}
+    proof_hashes = dict(
+        Transaction.objects.filter(pk__in=involved).values_list("pk", "proof_sha256")
+    )
+    extractions = ProofExtraction.objects.filter(
+        sha256__in=set(proof_hashes.values()), status=ProofExtraction.DONE
+    ).in_bulk(field_name="sha256")
+
+    flagged = 0
+    for transaction_id, earlier_ids in checks.items():
+        extraction = extractions.get(proof_hashes.get(transaction_id))
+        if extraction is None:
+            continue
+        match = next(
+            (
+                earlier_id
+                for earlier_id in sorted(earlier_ids)
+                if proof_hashes.get(earlier_id) in extractions
+                and extractions_match(
+                    extraction, extractions[proof_hashes[earlier_id]]
+                )
+            ),
+            None,
+        )
+        if match is not None:
+            flagged += Transaction.objects.filter(
+                pk=transaction_id,
+                duplicate_of__isnull=True,
+                possible_duplicate_of__isnull=True,
+            ).update(possible_duplicate_of_id=match)
+    return flagged
+
+
+def store_proof_fingerprint(transaction_id, phash):
+    """Index a transaction's proof hash (or drop it for non-image proofs)"""
+    if phash is None:
+        ProofFingerprint.objects.filter(transaction_id=transaction_id).delete()
+        return None
+    bands = phash_bands(phash)
+    fingerprint, _ = ProofFingerprint.objects.update_or_create(
+        transaction_id=transaction_id,
+        defaults={
+            "phash": phash,
+            **{f"band_{band}": value for band, value in enumerate(bands)},
+        },
+    )
+    return fingerprint
+
+
+def clean_amount(amount):
+    return str(int(float(amount)))
+
+
+def extract_amounts(text):
+    """Whole-number amounts found in OCR text, as strings"""
+    amounts = []
+    for number in re_amount.findall(text.translate(_amount_translation)):
+        number = number.replace(",", "")
+        # Skip things like version numbers or dotted dates
+        if re_plain_number.fullmatch(number):
+            amounts.append(clean_amount(number))
+    return amounts
+
+
+def extract_date(text):
+    """The first YYYY-MM-DD date in OCR text, or None"""
+    match = re_iso_date.search(text)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def guess_content_type(name):
+    return mimetypes.guess_type(name or "")[0] or "application/octet-stream"
+
+
+@lru_cache(maxsize=None)
+def gemini_model(api_key, model_name=GEMINI_MODEL):
+    """Configured Gemini model, built once per process"""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name)
+
+
+class GeminiOCRBackend:
+    def extract_text(self, data, content_type):
+        model = gemini_model(config("GEMINI_API_KEY"))
+        response = model.generate_content(
+            [OCR_PROMPT, {"mime_type": content_type, "data": data}]
+        )
+        return response.text
+
+
+class LocalOCRBackend:
+    """
+    Offline stand-in for development and tests. Images are read with
+    Tesseract when pytesseract is installed; anything else yields its
+    printable text runs (enough for text fixtures and uncompressed PDFs).
+    """
+
+    def extract_text(self, data, content_type):
+        if content_type.startswith("image/"):
+            try:
+                import pytesseract
+                from PIL import Image
+            except ImportError:
+                return ""
+            return pytesseract.image_to_string(Image.open(io.BytesIO(data)))
+        text = data.decode("utf-8", errors="ignore")
+        return "\n".join(re_printable_run.findall(text))
+
+
+@lru_cache(maxsize=None)
+def get_ocr_backend():
+    return import_string(settings.PROOF_OCR_BACKEND)()
+
+
+def fetch_proof(url):
+    """(bytes, content type) of a stored proof"""
+    response = requests.get(url, timeout=FETCH_TIMEOUT)
+    response.raise_for_status()
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+    return response.content, content_type or guess_content_type(url)
+
+
+def apply_extraction_text(extraction, text, content_type, backend):
+    extraction.text = text or ""
+    extraction.amounts = extract_amounts(extraction.text)
+    extraction.receipt_date = extract_date(extraction.text)
+    extraction.content_type = content_type
+    extraction.backend = f"{type(backend).__module__}.{type(backend).__name__}"
+    extraction.status = ProofExtraction.DONE
+    extraction.error = ""
+
+
+def enqueue_proof_extraction(txn):
+    """
+    Queue OCR for a transaction's proof. Returns the (possibly already
+    processed) ProofExtraction, or None when the transaction has no proof.
+    """
+    if not txn.proof_sha256:
+        return None
+    extraction, created = ProofExtraction.objects.get_or_create(
+        sha256=txn.proof_sha256,
+        defaults={"source_url": txn.proof_of_payment_url},
+    )
+    if not created and not extraction.source_url and txn.proof_of_payment_url:
+        extraction.source_url = txn.proof_of_payment_url
+        extraction.save(update_fields=["source_url", "updated_at"])
+    if extraction.status == ProofExtraction.DONE:
+        flag_possible_duplicates(txn.proof_sha256)
+    return extraction
+
+
+def claim_proof_extractions(limit):
+    """
+    Move up to `limit` pending jobs to processing and return them. Rows
+    locked by another worker are skipped, so workers can run side by side.
+    """
+    with transaction.atomic():
+        ids = list(
+            ProofExtraction.objects.select_for_update(skip_locked=True)
+            .filter(status=ProofExtraction.PENDING)
+            .order_by("created_at")
+            .values_list("pk", flat=True)[:limit]
+        )
+        ProofExtraction.objects.filter(pk__in=ids).update(
+            status=ProofExtraction.PROCESSING,
+            attempts=models.F("attempts") + 1,
+            updated_at=timezone.now(),
+        )
+    return list(ProofExtraction.objects.filter(pk__in=ids).order_by("created_at"))
+
+
+def requeue_stale_extractions(older_than):
+    """Return jobs stuck in processing (e.g. a killed worker) to the queue"""
+    return ProofExtraction.objects.filter(
+        status=ProofExtraction.PROCESSING,
+        updated_at__lt=timezone.now() - timedelta(seconds=older_than),
+    ).update(status=ProofExtraction.PENDING)
+
+
+def process_proof_extraction(extraction, backend=None, fetcher=None, max_attempts=3):
+    """Run OCR for one claimed job and store the result (or the error)"""
+    backend = backend or get_ocr_backend()
+    fetcher = fetcher or fetch_proof
+    try:
+        if not extraction.source_url:
+            raise ValueError("No stored file to read")
+        data, content_type = fetcher(extraction.source_url)
+        text = backend.extract_text(data, content_type)
+    except Exception as e:
+        logger.error(f"OCR failed for proof {extraction.sha256}: {str(e)}")
+        extraction.error = str(e)
+        extraction.status = (
+            ProofExtraction.FAILED
+            if extraction.attempts >= max_attempts
+            else ProofExtraction.PENDING
+        )
+    else:
+        apply_extraction_text(extraction, text, content_type, backend)
+    extraction.save()
+    if extraction.status == ProofExtraction.DONE:
+        flag_possible_duplicates(extraction.sha256)
+    return extraction
+
+
+def extract_proof_text(proof_file, backend=None):
+    """
+    OCR text of an uploaded file, synchronously. Served from the
+    ProofExtraction cache when the same file has been read before.
+    """
+    # OCR needs the bytes in memory; only ever a downsampled image or a
+    # file within the upload size limit. Hashed after downsampling, as
+    # Transaction.save does, so both paths share one cache key
+    ocr_file = downsample_image(proof_file)
+    sha256 = hash_proof_file(ocr_file)
+    cached = ProofExtraction.objects.filter(
+        sha256=sha256, status=ProofExtraction.DONE
+    ).first()
+    if cached is not None:
+        proof_file.seek(0)
+        return cached.text
+
+    backend = backend or get_ocr_backend()
+    content_type = sniff_file(ocr_file) or guess_content_type(
+        getattr(proof_file, "name", "")
+    )
+    text = backend.extract_text(ocr_file.read(), content_type)
+    proof_file.seek(0)
+
+    extraction, _ = ProofExtraction.objects.get_or_create(sha256=sha256)
+    apply_extraction_text(extraction, text, content_type, backend)
+    extraction.save()
+    flag_possible_duplicates(sha256)
+    return extraction.text
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction as db_transaction
+
+from .ercaspayServices import verify_ercaspay_transaction
+from .models import Transaction
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls at least 1/rate seconds apart.
+    A rate of 0 or None disables limiting.
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def pending_ercaspay_transactions():
+    """
+    Unverified Ercaspay checkouts. Manual proof uploads have no provider
+    reference and wait for admin review, so they are never sent to Ercaspay.
+    """
+    return (
+        Transaction.objects.filter(is_verified=False)
+        .exclude(payment_provider_reference__isnull=True)
+        .exclude(payment_provider_reference="")
+    )
+
+
+def verify_pending_transactions(transactions, workers=4, verifier=None, rate_limit=None):
+    """
+    Verify a batch of pending transactions with Ercaspay concurrently.
+
+    Returns a list of (transaction, verification_result, error) tuples in the
+    same order as `transactions`. `error` is set (and the result is None) when
+    the provider call raised, so callers can leave those rows for a later run.
+    `rate_limit` caps provider requests per second across all workers.
+    """
+    verifier = verifier or verify_ercaspay_transaction
+    limiter = RateLimiter(rate_limit)
+
+    def _verify(txn):
+        reference = txn.payment_provider_reference or txn.reference_id
+        limiter.wait()
+        try:
+            return txn, verifier(reference), None
+        except Exception as e:
+            logger.warning(
+                f"[RECONCILE][VERIFY_ERROR] ref={txn.reference_id} error={e}"
+            )
+            return txn, None, e
+
+    if not transactions:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(_verify, transactions))
+
+
+def provider_amount(verification_result):
+    """Amount reported by Ercaspay as a Decimal, or None when absent/invalid"""
+    data = (verification_result or {}).get("data") or {}
+    amount = data.get("amount")
+    if amount in (None, ""):
+        return None
+    try:
+        return Decimal(str(amount))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def apply_verified_transactions(transactions):
+    """
+    Mark transactions verified with a single UPDATE, then issue their receipts.
+
+    The bulk update bypasses post_save, so the lifecycle side effects are
+    scheduled explicitly for every row that actually flipped.
+    """
+    from .signals import schedule_transaction_effects
+
+    if not transactions:
+        return 0
+
+    with db_transaction.atomic():
+        pending = Transaction.objects.select_for_update().filter(
+            pk__in=[txn.pk for txn in transactions], is_verified=False
+        )
+        flipped_ids = set(pending.values_list("pk", flat=True))
+        Transaction.objects.filter(pk__in=flipped_ids).update(
+            is_verified=True, is_expired=False
+        )
+
+    for txn in transactions:
+        if txn.pk not in flipped_ids:
+            continue
+        txn.is_verified = True
+        txn.is_expired = False
+        txn._loaded_is_verified = True
+        schedule_transaction_effects(txn.pk, verified=True)
+
+    return len(flipped_ids)
@@ -1,5 +1,9 @@
+from collections import defaultdict
+
 from rest_framework import serializers
 
+from main.projections import api_datetime, api_decimal
+
 from .models import Transaction, TransactionReceipt
 
 
@@ -15,7 +19,7 @@ class TransactionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
         fields = "__all__"
-        read_only_fields = ["payer_name", "payment_item", "payer_matric", "payer_email", "proof_of_payment_url"]
+        read_only_fields = ["payer_name", "payment_item", "payer_matric", "payer_email", "proof_of_payment_url", "proof_sha256", "duplicate_of", "possible_duplicate_of", "proof_cdn_url", "proof_thumbnail_url"]
 
     def get_payment_item_titles(self, obj):
         return [item.title for item in obj.payment_items.all()]
@@ -43,6 +47,88 @@ class TransactionSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+TRANSACTION_LIST_VALUES = (
+    "id",
+    "payer__first_name",
+    "payer__last_name",
+    "payer__matric_number",
+    "payer__email",
+    "proof_of_payment",
+    "amount_paid",
+    "reference_id",
+    "payment_provider_reference",
+    "proof_sha256",
+    "proof_cdn_url",
+    "proof_thumbnail_url",
+    "is_verified",
+    "is_expired",
+    "submitted_at",
+    "payer_id",
+    "association_id",
+    "session_id",
+    "duplicate_of_id",
+    "possible_duplicate_of_id",
+)
+
+
+def transaction_list_values(queryset):
+    """The columns transaction_list_rows() needs, as a values() queryset"""
+    return queryset.values(*TRANSACTION_LIST_VALUES)
+
+
+def transaction_list_rows(values):
+    """
+    Dashboard list rows for transaction_list_values() output; the same keys
+    as TransactionSerializer except the raw proof_of_payment field (its URL
+    is still included). Payment items are loaded in one extra query.
+    """
+    values = list(values)
+    items = defaultdict(list)
+    through = Transaction.payment_items.through
+    for transaction_id, item_id, title in through.objects.filter(
+        transaction_id__in=[row["id"] for row in values]
+    ).values_list("transaction_id", "paymentitem_id", "paymentitem__title"):
+        items[transaction_id].append((item_id, title))
+
+    proof_field = Transaction._meta.get_field("proof_of_payment")
+    rows = []
+    for row in values:
+        proof = row["proof_of_payment"]
+        row_items = items[row["id"]]
+        first_name, last_name = row["payer__first_name"], row["payer__last_name"]
+        rows.append(
+            {
+                "id": row["id"],
+                "payment_item_titles": [title for _, title in row_items],
+                "payer_first_name": first_name,
+                "payer_last_name": last_name,
+                "payer_matric": row["payer__matric_number"],
+                "payer_email": row["payer__email"],
+                "payer_name": f"{first_name} {last_name}",
+                "proof_of_payment_url": (
+                    row["proof_cdn_url"]
+                    or (proof_field.to_python(proof).url if proof else "")
+                ),
+                "amount_paid": api_decimal(row["amount_paid"]),
+                "reference_id": row["reference_id"],
+                "payment_provider_reference": row["payment_provider_reference"],
+                "proof_sha256": row["proof_sha256"],
+                "proof_cdn_url": row["proof_cdn_url"],
+                "proof_thumbnail_url": row["proof_thumbnail_url"],
+                "is_verified": row["is_verified"],
+                "is_expired": row["is_expired"],
+                "submitted_at": api_datetime(row["submitted_at"]),
+                "payer": row["payer_id"],
+                "association": row["association_id"],
+                "session": row["session_id"],
+                "duplicate_of": row["duplicate_of_id"],
+                "possible_duplicate_of": row["possible_duplicate_of_id"],
+                "payment_items": [item_id for item_id, _ in row_items],
+            }
+        )
+    return rows
+
+
 class ProofAndTransactionSerializer(serializers.Serializer):
     association_short_name = serializers.CharField()
     payer = serializers.JSONField()
@@ -69,7 +155,9 @@ class TransactionReceiptDetailSerializer(serializers.ModelSerializer):
     association_short_name = serializers.CharField(
         source="transaction.association.association_short_name"
     )
-    association_logo = serializers.ImageField(source="transaction.association.logo")
+    association_logo = serializers.CharField(
+        source="transaction.association.logo_url", read_only=True
+    )
     association_theme_color = serializers.CharField(
         source="transaction.association.theme_color"
     )
@@ -1,9 +1,8 @@
 import logging
-import os
-import re
 
-import google.generativeai as genai
-from decouple import config
+from .proofs import clean_amount, extract_amounts, extract_date, extract_proof_text
+
+logger = logging.getLogger(__name__)
 
 
 class VerificationService:
@@ -14,67 +13,24 @@ class VerificationService:
         self.payment_items = payment_items
         self.phone_no = self.bank_account.association.admin.phone_number
         self.email = self.bank_account.association.admin.email
-        self.gemini_api_key = config("GEMINI_API_KEY")
-        genai.configure(api_key=self.gemini_api_key)
-        self.model = genai.GenerativeModel("gemini-2.0-flash")
 
     def extract_text_from_proof(self):
+        # Cached per file hash; the OCR model itself is built once per process
         try:
-            if hasattr(self.proof_file, "seek"):
-                self.proof_file.seek(0)
-            file_bytes = self.proof_file.read()
-
-            mime_type = "application/octet-stream"
-            if (
-                hasattr(self.proof_file, "content_type")
-                and self.proof_file.content_type
-            ):
-                mime_type = self.proof_file.content_type
-            elif hasattr(self.proof_file, "name"):
-                file_extension = os.path.splitext(self.proof_file.name)[1].lower()
-                if file_extension == ".jpg" or file_extension == ".jpeg":
-                    mime_type = "image/jpeg"
-                elif file_extension == ".png":
-                    mime_type = "image/png"
-                elif file_extension == ".pdf":
-                    mime_type = "application/pdf"
-
-            image_part = {"mime_type": mime_type, "data": file_bytes}
-
-            prompt_parts = [
-                "Extract all visible text from this document/image. Provide the text as plain, unformatted content.",
-                image_part,
-            ]
-
-            response = self.model.generate_content(prompt_parts)
-            extracted_text = response.text
-            print(f"Extracted text: {extracted_text}")
-            return extracted_text
-
+            return extract_proof_text(self.proof_file)
         except Exception as e:
-            print(f"Error extracting text with Gemini API: {e}")
+            logger.error(f"Error extracting text from proof: {e}")
             return ""
 
     def clean_amount(self, amount):
-        return str(int(float(amount)))
+        return clean_amount(amount)
 
     def extract_amounts_from_text(self, text):
-        text = text.replace("O", "0").replace("o", "0")
-        text = re.sub(r"[₦N]", "", text)
-        numbers = re.findall(r"\d[\d,\.]*", text)
-        cleaned = []
-        for n in numbers:
-            n_clean = n.replace(",", "")
-            # Only keep numbers with at most one decimal point
-            if n_clean.count(".") <= 1 and re.match(r"^\d+(\.\d+)?$", n_clean):
-                cleaned.append(self.clean_amount(n_clean))
-        return cleaned
+        return extract_amounts(text)
 
     def extract_date_from_text(self, text):
-        import re
-
-        match = re.search(r"(\d{4}-\d{2}-\d{2})", text)
-        return match.group(1) if match else None
+        receipt_date = extract_date(text)
+        return receipt_date.isoformat() if receipt_date else None
 
     def verify_proof(self):
         text = self.extract_text_from_proof()
@@ -107,6 +63,3 @@ class VerificationService:
         # Add more checks as needed... beneficiary account number
 
         return True, "Proof verified successfully."
-
-
-logger = logging.getLogger(__name__)
@@ -1,45 +1,154 @@
-from django.db.models.signals import post_save
+import logging
+
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+
+from association.services import create_notification_for_transaction
+
+from .analytics import invalidate_session_analytics
 from .emails import send_admin_new_transaction_email, send_receipt_email
+from .events import (
+    has_transaction_subscribers,
+    publish_transaction_event,
+    session_totals_payload,
+    transaction_payload,
+)
 from .models import Transaction, TransactionReceipt
+from .proofs import enqueue_proof_extraction
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=Transaction)
-def notify_admin_on_transaction(sender, instance, created, **kwargs):
-    if created:
-        association = instance.association
-        admin = association.admin
-        if admin.email:
-            send_admin_new_transaction_email(admin, association, instance)
+def dispatch_transaction_lifecycle(sender, instance, created, **kwargs):
+    """
+    Single post_save entry point for transaction side effects.
 
+    Only a newly created transaction or an is_verified False -> True flip
+    triggers anything, so no-op saves of verified transactions no longer
+    resend receipts. A True -> False flip only drops cached analytics.
+    """
+    was_verified = getattr(instance, "_loaded_is_verified", False)
+    became_verified = instance.is_verified and not was_verified
+    instance._loaded_is_verified = instance.is_verified
+    # Set by Transaction.save when a new proof file was uploaded
+    proof_uploaded = getattr(instance, "_proof_uploaded", False)
+    instance._proof_uploaded = False
 
-@receiver(post_save, sender=Transaction)
-def create_receipt_on_verification(sender, instance, created, **kwargs):
-    """Signal: Create and send receipt when transaction is verified"""
-    # Only proceed if transaction is verified
+    if was_verified and not instance.is_verified:
+        session_id = instance.session_id
+        db_transaction.on_commit(lambda: invalidate_session_analytics(session_id))
+
+    if created or became_verified or proof_uploaded:
+        schedule_transaction_effects(
+            instance.pk,
+            created=created,
+            verified=became_verified,
+            proof_uploaded=proof_uploaded,
+        )
+
+
+@receiver(post_delete, sender=Transaction)
+def drop_deleted_transaction_analytics(sender, instance, **kwargs):
+    """A deleted verified transaction leaves its session's totals"""
     if instance.is_verified:
+        session_id = instance.session_id
+        db_transaction.on_commit(lambda: invalidate_session_analytics(session_id))
+
+
+def schedule_transaction_effects(
+    transaction_id, created=False, verified=False, proof_uploaded=False
+):
+    """
+    Run lifecycle side effects once the surrounding DB transaction commits.
+    Also used by bulk paths (reconciliation) that bypass post_save.
+    """
+
+    def run():
+        txn = Transaction.objects.select_related(
+            "association__admin", "payer", "session"
+        ).get(pk=transaction_id)
+        if proof_uploaded:
+            _on_proof_uploaded(txn)
+        if created:
+            _on_transaction_created(txn)
+        if verified:
+            invalidate_session_analytics(txn.session_id)
+            _on_transaction_verified(txn)
+        if created or verified:
+            _publish_dashboard_events(txn, created, verified)
+
+    db_transaction.on_commit(run)
+
+
+def _on_proof_uploaded(txn):
+    """Queue OCR for the proof; process_proof_extractions picks it up"""
+    try:
+        enqueue_proof_extraction(txn)
+    except Exception as e:
+        logger.error(
+            f"Failed to queue proof OCR for transaction {txn.reference_id}: {str(e)}"
+        )
+
+
+def _on_transaction_created(txn):
+    try:
+        create_notification_for_transaction(txn)
+    except Exception as e:
+        logger.error(
+            f"Failed to create notification for transaction {txn.reference_id}: {str(e)}"
+        )
+
+    admin = txn.association.admin
+    if admin.email:
         try:
-            # Get existing receipt or create new one
-            receipt, receipt_created = TransactionReceipt.objects.get_or_create(
-                transaction=instance
+            send_admin_new_transaction_email(admin, txn.association, txn)
+        except Exception as e:
+            logger.error(
+                f"Failed to send admin alert for transaction {txn.reference_id}: {str(e)}"
             )
 
-            # Always generate and send receipt (whether new or existing)
-            send_receipt_email(receipt)
 
-            if receipt_created:
-                print(
-                    f"✅ New receipt created and sent for transaction {instance.reference_id}"
-                )
-            else:
-                print(
-                    f"✅ Existing receipt resent for transaction {instance.reference_id}"
-                )
+def _on_transaction_verified(txn):
+    """Create and send receipt when transaction is verified"""
+    try:
+        receipt, receipt_created = TransactionReceipt.objects.get_or_create(
+            transaction=txn
+        )
+        # The receipt's transaction already carries the loaded relations
+        receipt.transaction = txn
+        send_receipt_email(receipt)
+        logger.info(
+            f"Receipt {'created' if receipt_created else 're-issued'} and sent "
+            f"for transaction {txn.reference_id}"
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to process receipt for transaction {txn.reference_id}: {str(e)}"
+        )
 
-        except Exception as e:
-            import logging
 
-            logger = logging.getLogger(__name__)
-            logger.error(
-                f"Failed to process receipt for transaction {instance.reference_id}: {str(e)}"
+def _publish_dashboard_events(txn, created, verified):
+    """Push deltas to live dashboard streams (see TransactionViewSet.stream)"""
+    try:
+        if not has_transaction_subscribers(txn.association_id):
+            return
+        if created:
+            publish_transaction_event(
+                txn.association_id, "transaction.created", transaction_payload(txn)
+            )
+        if verified:
+            publish_transaction_event(
+                txn.association_id,
+                "transaction.verified",
+                {"id": txn.pk, "reference_id": txn.reference_id},
+            )
+        if txn.session_id:
+            publish_transaction_event(
+                txn.association_id, "totals", session_totals_payload(txn.session_id)
             )
+    except Exception as e:
+        logger.error(
+            f"Failed to publish dashboard events for transaction {txn.reference_id}: {str(e)}"
+        )
@@ -1 +1,268 @@
-# Create your tests here.
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from association.models import Session
+from main.models import AdminUser
+from payers.models import Payer
+from payments.models import PaymentItem
+
+from .models import ProofExtraction, Transaction
+from .proofs import LocalOCRBackend, store_proof_fingerprint
+
+
+def create_association_data():
+    """An association with a current session, one compulsory item and a payer"""
+    admin = AdminUser.objects.create_user(
+        username="admin",
+        email="admin@example.com",
+        password="password",
+        first_name="Ada",
+        last_name="Admin",
+        phone_number="08000000000",
+    )
+    association = admin.association
+    session = Session.objects.create(
+        association=association, title="2025/2026", is_active=True
+    )
+    association.current_session = session
+    association.save()
+    item = PaymentItem.objects.create(
+        association=association,
+        session=session,
+        title="Dues",
+        amount=Decimal("5000"),
+        status="compulsory",
+        compulsory_for=["300"],
+    )
+    payer = Payer.objects.create(
+        association=association,
+        session=session,
+        first_name="Tola",
+        last_name="Payer",
+        email="payer@example.com",
+        level="300",
+        phone_number="08011111111",
+        matric_number="MAT/001",
+    )
+    return association, session, item, payer
+
+
+class StubVerifier:
+    """verify_ercaspay_transaction() stand-in answering from a dict"""
+
+    def __init__(self, results):
+        self.results = results
+        self.references = []
+
+    def __call__(self, reference):
+        self.references.append(reference)
+        return self.results[reference]
+
+
+def paid(amount="5000"):
+    return {"status": True, "data": {"status": "SUCCESSFUL", "amount": amount}}
+
+
+def pending():
+    return {"status": True, "data": {"status": "PENDING"}}
+
+
+class ErcaspayCommandTestCase(TestCase):
+    def setUp(self):
+        self.association, self.session, self.item, self.payer = (
+            create_association_data()
+        )
+
+    def create_transaction(self, provider_reference, hours_ago):
+        txn = Transaction.objects.create(
+            payer=self.payer,
+            association=self.association,
+            session=self.session,
+            amount_paid=Decimal("5000"),
+            payment_provider_reference=provider_reference,
+        )
+        Transaction.objects.filter(pk=txn.pk).update(
+            submitted_at=timezone.now() - timedelta(hours=hours_ago)
+        )
+        return txn
+
+    def run_command(self, name, verifier, **options):
+        call_command(name, verifier=verifier, stdout=StringIO(), **options)
+
+
+class ReconcileErcaspayCommandTests(ErcaspayCommandTestCase):
+    def test_verifies_paid_checkouts_and_skips_manual_uploads(self):
+        paid_txn = self.create_transaction("ERCS-PAID", hours_ago=2)
+        pending_txn = self.create_transaction("ERCS-PENDING", hours_ago=2)
+        short_txn = self.create_transaction("ERCS-SHORT", hours_ago=2)
+        manual_txn = self.create_transaction(None, hours_ago=2)
+        verifier = StubVerifier(
+            {
+                "ERCS-PAID": paid(),
+                "ERCS-PENDING": pending(),
+                "ERCS-SHORT": paid(amount="100"),
+            }
+        )
+
+        self.run_command("reconcile_ercaspay", verifier, workers=1, rate=0)
+
+        self.assertCountEqual(
+            verifier.references, ["ERCS-PAID", "ERCS-PENDING", "ERCS-SHORT"]
+        )
+        paid_txn.refresh_from_db()
+        pending_txn.refresh_from_db()
+        short_txn.refresh_from_db()
+        manual_txn.refresh_from_db()
+        self.assertTrue(paid_txn.is_verified)
+        self.assertFalse(pending_txn.is_verified)
+        self.assertFalse(short_txn.is_verified)
+        self.assertFalse(manual_txn.is_verified)
+
+    def test_dry_run_writes_nothing(self):
+        txn = self.create_transaction("ERCS-PAID", hours_ago=2)
+
+        self.run_command(
+            "reconcile_ercaspay",
+            StubVerifier({"ERCS-PAID": paid()}),
+            rate=0,
+            dry_run=True,
+        )
+
+        txn.refresh_from_db()
+        self.assertFalse(txn.is_verified)
+
+
+class ExpirePendingTransactionsCommandTests(ErcaspayCommandTestCase):
+    def test_expires_only_checkouts_the_provider_reports_as_failed(self):
+        failed_txn = self.create_transaction("ERCS-FAILED", hours_ago=48)
+        unknown_txn = self.create_transaction("ERCS-UNKNOWN", hours_ago=48)
+        error_txn = self.create_transaction("ERCS-ERROR", hours_ago=48)
+        paid_txn = self.create_transaction("ERCS-PAID", hours_ago=48)
+        recent_txn = self.create_transaction("ERCS-RECENT", hours_ago=1)
+        manual_txn = self.create_transaction("", hours_ago=48)
+        verifier = StubVerifier(
+            {
+                "ERCS-FAILED": {"status": True, "data": {"status": "FAILED"}},
+                "ERCS-UNKNOWN": {"status": False, "status_code": 404},
+                "ERCS-ERROR": {"status": False, "status_code": 401},
+                "ERCS-PAID": paid(),
+            }
+        )
+
+        self.run_command("expire_pending_transactions", verifier, workers=1)
+
+        self.assertCountEqual(
+            verifier.references,
+            ["ERCS-FAILED", "ERCS-UNKNOWN", "ERCS-ERROR", "ERCS-PAID"],
+        )
+        for txn in (
+            failed_txn, unknown_txn, error_txn, paid_txn, recent_txn, manual_txn
+        ):
+            txn.refresh_from_db()
+        self.assertTrue(failed_txn.is_expired)
+        self.assertTrue(unknown_txn.is_expired)
+        self.assertFalse(error_txn.is_expired)
+        self.assertTrue(paid_txn.is_verified)
+        self.assertFalse(paid_txn.is_expired)
+        self.assertFalse(recent_txn.is_expired)
+        self.assertFalse(manual_txn.is_expired)
+
+
+class ProofExtractionPipelineTests(TransactionTestCase):
+    # Jobs are processed in worker threads, which only see committed rows
+
+    def setUp(self):
+        self.association, self.session, self.item, self.payer = (
+            create_association_data()
+        )
+        self.proofs = {}
+
+    def create_proof_transaction(self, sha256, phash, text):
+        txn = Transaction.objects.create(
+            payer=self.payer,
+            association=self.association,
+            session=self.session,
+            amount_paid=Decimal("5000"),
+        )
+        Transaction.objects.filter(pk=txn.pk).update(proof_sha256=sha256)
+        store_proof_fingerprint(txn.pk, phash)
+        url = f"https://proofs.example.com/{sha256}.txt"
+        self.proofs[url] = text.encode("utf-8")
+        ProofExtraction.objects.create(sha256=sha256, source_url=url)
+        return txn
+
+    def fetch(self, url):
+        return self.proofs[url], "text/plain"
+
+    def process(self):
+        call_command(
+            "process_proof_extractions",
+            ocr_backend=LocalOCRBackend(),
+            fetcher=self.fetch,
+            workers=1,
+            stdout=StringIO(),
+        )
+
+    def test_extracts_text_with_the_local_backend(self):
+        self.create_proof_transaction(
+            "a" * 64, 0x0F0F0F0F0F0F0F0F, "Amount NGN 5,000 on 2025-09-01"
+        )
+
+        self.process()
+
+        extraction = ProofExtraction.objects.get(sha256="a" * 64)
+        self.assertEqual(extraction.status, ProofExtraction.DONE)
+        self.assertIn("NGN 5,000", extraction.text)
+        self.assertIn("5000", extraction.amounts)
+        self.assertEqual(str(extraction.receipt_date), "2025-09-01")
+
+    def test_failed_fetch_is_retried_then_marked_failed(self):
+        self.create_proof_transaction("b" * 64, 0x0F0F0F0F0F0F0F0F, "")
+        self.proofs.clear()
+
+        call_command(
+            "process_proof_extractions",
+            ocr_backend=LocalOCRBackend(),
+            fetcher=self.fetch,
+            workers=1,
+            max_attempts=1,
+            stdout=StringIO(),
+        )
+
+        extraction = ProofExtraction.objects.get(sha256="b" * 64)
+        self.assertEqual(extraction.status, ProofExtraction.FAILED)
+        self.assertEqual(extraction.attempts, 1)
+
+    def test_near_duplicate_is_flagged_only_when_ocr_matches(self):
+        original = self.create_proof_transaction(
+            "c" * 64,
+            0x0F0F0F0F0F0F0F0F,
+            "Transfer ref 000123456789012 NGN 5,000 on 2025-09-01",
+        )
+        # Same screenshot, re-encoded: one bit off and the same reference
+        reused = self.create_proof_transaction(
+            "d" * 64,
+            0x0F0F0F0F0F0F0F0E,
+            "Transfer ref 000123456789012 NGN 5,000 on 2025-09-01",
+        )
+        # Same banking app layout, a different payment
+        lookalike = self.create_proof_transaction(
+            "e" * 64,
+            0x0F0F0F0F0F0F0F0D,
+            "Transfer ref 000987654321098 NGN 7,500 on 2025-09-02",
+        )
+
+        self.process()
+
+        original.refresh_from_db()
+        reused.refresh_from_db()
+        lookalike.refresh_from_db()
+        self.assertIsNone(original.possible_duplicate_of_id)
+        self.assertEqual(reused.possible_duplicate_of_id, original.pk)
+        self.assertIsNone(lookalike.possible_duplicate_of_id)
+        self.assertIsNone(reused.duplicate_of_id)
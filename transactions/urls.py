@@ -1,28 +1,50 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
+from .async_views import (
+    ercaspay_webhook_async,
+    initiate_payment_async,
+    payment_status_async,
+)
 from .views import (
     InitiatePaymentView,
     PaymentStatusView,
     TransactionReceiptDetailView,
     TransactionViewSet,
     ercaspay_webhook,
+    receipt_pdf_view,
 )
 
 router = DefaultRouter()
 router.register("", TransactionViewSet)
 
+# Provider-bound endpoints have async twins for the ASGI (uvicorn) run mode
+if settings.ASYNC_PROVIDER_VIEWS:
+    webhook_view = ercaspay_webhook_async
+    initiate_view = initiate_payment_async
+    status_view = payment_status_async
+else:
+    webhook_view = ercaspay_webhook
+    initiate_view = InitiatePaymentView.as_view()
+    status_view = PaymentStatusView.as_view()
+
 urlpatterns = [
-    path("webhook/", ercaspay_webhook, name="ercaspay-webhook"),  # Updated
+    path("webhook/", webhook_view, name="ercaspay-webhook"),  # Updated
+    path(
+        "receipts/<str:receipt_id>/pdf/",
+        receipt_pdf_view,
+        name="receipt-pdf",
+    ),
     path(
         "receipts/<str:receipt_id>/",
         TransactionReceiptDetailView.as_view(),
         name="receipt-detail",
     ),
-    path("payment/initiate/", InitiatePaymentView.as_view(), name="initiate-payment"),  # Card + Bank  # Bank only
+    path("payment/initiate/", initiate_view, name="initiate-payment"),  # Card + Bank  # Bank only
     path(
         "payment/status/<str:reference_id>/",
-        PaymentStatusView.as_view(),
+        status_view,
         name="payment-status",
     ),
-] + router.urls  # Router URLs LAST
\ No newline at end of file
+] + router.urls  # Router URLs LAST
@@ -1,16 +1,26 @@
 import json
 import logging
+import time
 from decimal import Decimal
 from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.db import models
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseForbidden,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -19,60 +29,88 @@ from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 
 from association.models import Association, Session
+from association.scoping import SessionScopedMixin
+from main.authentication import QueryParamJWTAuthentication
+from main.projections import api_decimal
+from main.renderers import CustomJSONRenderer, EventStreamRenderer
 from payers.models import Payer
 from payments.models import PaymentItem, ReceiverBankAccount
 from transactions.models import Transaction
 
-print("DEBUG: Starting to import paystackServices")
-
+from .analytics import BUCKETS as ANALYTICS_BUCKETS
+from .analytics import combine_session_analytics
 from .ercaspayServices import (
     ercaspay_init_payment,
     verify_ercaspay_transaction
 )
-from .models import Transaction, TransactionReceipt
-from .serializers import TransactionReceiptDetailSerializer, TransactionSerializer
+from .events import (
+    session_totals_payload,
+    subscribe_transaction_events,
+    transaction_totals,
+)
+from .models import ProofExtraction, Transaction, TransactionReceipt
+from .pdf import get_or_render_receipt_pdf, receipt_pdf_storage
+from .proofs import clean_amount
+from .serializers import (
+    TransactionReceiptDetailSerializer,
+    TransactionSerializer,
+    transaction_list_rows,
+    transaction_list_values,
+)
 
 logger = logging.getLogger(__name__)
 
+# Live dashboard stream (TransactionViewSet.stream), in seconds. Connections
+# are recycled after STREAM_MAX_SECONDS; EventSource reconnects on its own.
+STREAM_KEEPALIVE_SECONDS = 15
+STREAM_MAX_SECONDS = 300
+
+
+def _sse_message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _sse_from_bus(message):
+    payload = json.loads(message)
+    return _sse_message(payload["event"], payload["data"])
+
+
+async def _async_event_stream(subscription, initial_totals):
+    """SSE async generator, for ASGI (uvicorn) workers"""
+    deadline = time.monotonic() + STREAM_MAX_SECONDS
+    try:
+        yield "retry: 3000\n\n"
+        if initial_totals is not None:
+            yield _sse_message("totals", initial_totals)
+        while time.monotonic() < deadline:
+            message = await subscription.aget(timeout=STREAM_KEEPALIVE_SECONDS)
+            yield _sse_from_bus(message) if message else ": keepalive\n\n"
+    finally:
+        await subscription.aclose()
+
+
 class TransactionPagination(PageNumberPagination):
     page_size = 7  
     page_size_query_param = 'page_size'  
     max_page_size = 1000
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(SessionScopedMixin, viewsets.ModelViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = TransactionPagination
 
     def get_queryset(self):
-        association = getattr(self.request.user, "association", None)
-        queryset = Transaction.objects.none()
-
-        if association:
-            # Get session_id from query params or use current session
-            session_id = self.request.query_params.get("session_id")
+        queryset = self.scoped_queryset(Transaction.objects.all())
 
-            if session_id:
-                # Validate that session belongs to this association
-                try:
-                    session = Session.objects.get(
-                        id=session_id, association=association
-                    )
-                    queryset = Transaction.objects.filter(session=session)
-                except Session.DoesNotExist:
-                    queryset = Transaction.objects.none()
-            elif association.current_session:
-                # Use current session if no session_id provided
-                queryset = Transaction.objects.filter(
-                    session=association.current_session
-                )
-            else:
-                # No session available, return empty queryset
-                queryset = Transaction.objects.none()
-
-        # Filter by verification status (case-insensitive)
+        # Filter by verification status (case-insensitive).
+        # Expired (abandoned) checkouts are hidden unless explicitly requested.
         status_param = self.request.query_params.get("status")
+        if status_param is not None and status_param.lower() == "expired":
+            queryset = queryset.filter(is_expired=True)
+        else:
+            queryset = queryset.filter(is_expired=False)
+
         if status_param is not None:
             if status_param.lower() == "verified":
                 queryset = queryset.filter(is_verified=True)
@@ -92,45 +130,32 @@ class TransactionViewSet(viewsets.ModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        association = getattr(self.request.user, "association", None)
-        if not association or not association.current_session:
-            raise ValidationError(
-                "No current session available. Please create a session first."
-            )
+        association, session = self.require_current_session()
 
         serializer.save(
             payer=self.request.user.payer,
             association=association,
-            session=association.current_session,  # Auto-assign current session
+            session=session,  # Auto-assign current session
         )
 
     def list(self, request, *args, **kwargs):
         # Check if association has a current session
-        association = getattr(self.request.user, "association", None)
-        if not association:
+        scope = self.scope
+        if not scope.association:
             return Response(
                 {"error": "No association found for user"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        session_id = self.request.query_params.get("session_id")
-        current_session = None
-
-        if session_id:
-            try:
-                current_session = Session.objects.get(
-                    id=session_id, association=association
-                )
-            except Session.DoesNotExist:
-                return Response(
-                    {
-                        "error": "Session not found or does not belong to your association"
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-        elif association.current_session:
-            current_session = association.current_session
-        else:
+        if scope.session_not_found:
+            return Response(
+                {
+                    "error": "Session not found or does not belong to your association"
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        current_session = scope.session
+        if current_session is None:
             return Response(
                 {
                     "error": "No session available. Please create a session first.",
@@ -152,26 +177,18 @@ class TransactionViewSet(viewsets.ModelViewSet):
             )
 
         queryset = self.filter_queryset(self.get_queryset()).order_by("-submitted_at")
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            data = serializer.data
-        else:
-            serializer = self.get_serializer(queryset, many=True)
-            data = serializer.data
-
-        total_collections = (
-            queryset.aggregate(total=models.Sum("amount_paid"))["total"] or 0
-        )
-
-        # Completed Payments (assuming is_verified=True means completed)
-        completed_count = queryset.filter(is_verified=True).count()
+        # Rows are projected from values() rather than TransactionSerializer
+        values = transaction_list_values(queryset)
+        page = self.paginate_queryset(values)
+        data = transaction_list_rows(page if page is not None else values)
 
-        # Pending Payments (assuming is_verified=False means pending)
-        pending_count = queryset.filter(is_verified=False).count()
+        # Sum and counts (completed = verified, pending = not) in one query
+        totals = transaction_totals(queryset)
+        completed_count = totals["completed_payments"]
+        pending_count = totals["pending_payments"]
 
         # Calculate percentages
-        total_count = queryset.count()
+        total_count = totals["total_transactions"]
         percent_completed = (
             round((completed_count / total_count * 100), 1) if total_count > 0 else 0
         )
@@ -180,7 +197,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         )
 
         meta = {
-            "total_collections": float(total_collections),
+            "total_collections": totals["total_collections"],
             "completed_payments": completed_count,
             "pending_payments": pending_count,
             "total_transactions": total_count,
@@ -217,6 +234,142 @@ class TransactionViewSet(viewsets.ModelViewSet):
             )
 
 
+    @action(
+        detail=False,
+        methods=["get"],
+        authentication_classes=[QueryParamJWTAuthentication],
+        renderer_classes=[CustomJSONRenderer, EventStreamRenderer],
+    )
+    def stream(self, request):
+        """
+        Server-Sent Events feed of dashboard deltas for the admin's association:
+        transaction.created, transaction.verified and totals (the list meta
+        counters of the affected session). A totals snapshot for the current
+        session is sent first. EventSource clients pass the access token as
+        ?token= since they cannot set headers.
+
+        Only served with settings.LIVE_STREAM_ENABLED (ASGI workers and the
+        Redis event bus) and under ASGI; otherwise 503, and the dashboard
+        falls back to polling the list.
+        """
+        if not settings.LIVE_STREAM_ENABLED or not isinstance(
+            request._request, ASGIRequest
+        ):
+            return Response(
+                {
+                    "error": "Live updates are not available on this server; "
+                    "poll /api/transactions/ instead."
+                },
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        association = getattr(request.user, "association", None)
+        if not association:
+            return Response(
+                {"error": "No association found for user"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        initial_totals = (
+            session_totals_payload(association.current_session_id)
+            if association.current_session_id
+            else None
+        )
+        subscription = subscribe_transaction_events(association.pk)
+        response = StreamingHttpResponse(
+            _async_event_stream(subscription, initial_totals),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @action(detail=False, methods=["get"])
+    def analytics(self, request):
+        """
+        Verified collections for dashboard charts: a ?bucket=day|week series
+        with breakdowns by session, payment item, level and faculty. Covers
+        the scoped session, or ?sessions=all / ?sessions=<id>,<id> to compare
+        sessions.
+        """
+        scope = self.scope
+        if not scope.association:
+            return Response(
+                {"error": "No association found for user"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        bucket = request.query_params.get("bucket", "day")
+        if bucket not in ANALYTICS_BUCKETS:
+            raise ValidationError("bucket must be day or week")
+
+        sessions_param = request.query_params.get("sessions")
+        if sessions_param:
+            sessions = Session.objects.filter(association=scope.association).only(
+                "pk", "title"
+            )
+            if sessions_param != "all":
+                try:
+                    ids = [int(pk) for pk in sessions_param.split(",")]
+                except ValueError:
+                    raise ValidationError("sessions must be all or a list of ids")
+                sessions = sessions.filter(pk__in=ids)
+            sessions = list(sessions.order_by("created_at"))
+        elif scope.session_not_found:
+            return Response(
+                {
+                    "error": "Session not found or does not belong to your association"
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        else:
+            sessions = [scope.session] if scope.session else []
+
+        analytics = combine_session_analytics(sessions, bucket)
+
+        def amounts(rows):
+            return [{**row, "amount": api_decimal(row["amount"])} for row in rows]
+
+        return Response(
+            {
+                "bucket": bucket,
+                "total_amount": api_decimal(analytics["amount"]),
+                "total_count": analytics["count"],
+                "series": amounts(analytics["series"]),
+                "by_session": amounts(analytics["by_session"]),
+                "by_item": amounts(analytics["by_item"]),
+                "by_level": amounts(analytics["by_level"]),
+                "by_faculty": amounts(analytics["by_faculty"]),
+            }
+        )
+
+    @action(detail=True, methods=["get"])
+    def proof(self, request, pk=None):
+        """OCR result for the transaction's proof of payment (queued in the background)"""
+        txn = self.get_object()
+        if not txn.proof_sha256:
+            return Response(
+                {"error": "This transaction has no proof of payment"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        extraction = ProofExtraction.objects.filter(sha256=txn.proof_sha256).first()
+        if extraction is None:
+            return Response({"status": ProofExtraction.PENDING})
+
+        data = {"status": extraction.status}
+        if extraction.status == ProofExtraction.DONE:
+            data.update(
+                {
+                    "text": extraction.text,
+                    "amounts": extraction.amounts,
+                    "receipt_date": extraction.receipt_date,
+                    "amount_matches": clean_amount(txn.amount_paid)
+                    in extraction.amounts,
+                }
+            )
+        return Response(data)
+
+
 class TransactionReceiptDetailView(RetrieveAPIView):
     queryset = TransactionReceipt.objects.select_related(
         "transaction__payer", "transaction__association", "transaction__session"
@@ -226,6 +379,80 @@ class TransactionReceiptDetailView(RetrieveAPIView):
     lookup_field = "receipt_id"
 
 
+@require_http_methods(["GET", "HEAD"])
+def receipt_pdf_view(request, receipt_id):
+    """
+    Stream the receipt PDF. The file is rendered once per receipt content and
+    served from the cache afterwards; the content hash doubles as the ETag.
+    """
+    receipt = get_object_or_404(
+        TransactionReceipt.objects.select_related(
+            "transaction__payer", "transaction__association", "transaction__session"
+        ).prefetch_related("transaction__payment_items"),
+        receipt_id=receipt_id,
+    )
+    content_hash, name = get_or_render_receipt_pdf(receipt)
+    etag = f'"{content_hash}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = FileResponse(
+            receipt_pdf_storage().open(name, "rb"),
+            content_type="application/pdf",
+            filename=f"receipt-{receipt.receipt_no}.pdf",
+        )
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def build_checkout_customer(payer):
+    """Customer details for Ercaspay - always use payer information"""
+    full_name = f"{getattr(payer, 'first_name', '')} {getattr(payer, 'last_name', '')}".strip() or "DuesPay User"
+    email = getattr(payer, "email", None) or getattr(settings, "PLATFORM_EMAIL", "justondev05@gmail.com")
+
+    # Ensure valid email format
+    if "@" not in str(email):
+        email = getattr(settings, "PLATFORM_EMAIL", "justondev05@gmail.com")
+
+    phone = getattr(payer, "phone_number", "")
+    if not phone:
+        phone = "0000000000"
+
+    return {
+        "name": full_name,
+        "email": email,
+        "phone_number": phone
+    }
+
+
+def checkout_redirect_url():
+    """Frontend redirect - Ercaspay will redirect to /pay after payment"""
+    frontend = getattr(settings, "FRONTEND_URL", "https://nacos-duespay.vercel.app/")
+    return f"{str(frontend).rstrip('/')}/pay"
+
+
+def build_checkout_metadata(txn, association, payer, base_amount, transaction_fee, total_with_fees):
+    """Metadata for reconciliation"""
+    return {
+        "txn_ref": txn.reference_id,
+        "association_id": association.id,
+        "payer_id": payer.id,
+        "base_amount": str(base_amount),
+        "transaction_fee": str(transaction_fee),
+        "total_amount": str(total_with_fees),
+    }
+
+
+def webhook_transaction_lookup(pay_ref, tx_ref):
+    """Match a webhook to a transaction by merchant or Ercas reference"""
+    return (
+        models.Q(reference_id=pay_ref)
+        | models.Q(reference_id=tx_ref)
+        | models.Q(payment_provider_reference=tx_ref)
+    )
+
+
 class InitiatePaymentView(APIView):
     permission_classes = [AllowAny]
 
@@ -278,37 +505,11 @@ class InitiatePaymentView(APIView):
         )
         txn.payment_items.set(items_qs)
 
-        # Customer details - always use payer information
-        full_name = f"{getattr(payer, 'first_name', '')} {getattr(payer, 'last_name', '')}".strip() or "DuesPay User"
-        email = getattr(payer, "email", None) or getattr(settings, "PLATFORM_EMAIL", "justondev05@gmail.com")
-        
-        # Ensure valid email format
-        if "@" not in str(email):
-            email = getattr(settings, "PLATFORM_EMAIL", "justondev05@gmail.com")
-        
-        phone = getattr(payer, "phone_number", "")
-        if not phone:
-            phone = "0000000000"
-
-        customer = {
-            "name": full_name, 
-            "email": email,
-            "phone_number": phone
-        }
-
-        # Frontend redirect - Ercaspay will redirect to /pay after payment
-        frontend = getattr(settings, "FRONTEND_URL", "https://nacos-duespay.vercel.app/")
-        redirect_url = f"{str(frontend).rstrip('/')}/pay"
-
-        # Metadata for reconciliation
-        metadata = {
-            "txn_ref": txn.reference_id,
-            "association_id": association.id,
-            "payer_id": payer.id,
-            "base_amount": str(base_amount),
-            "transaction_fee": str(transaction_fee),
-            "total_amount": str(total_with_fees),
-        }
+        customer = build_checkout_customer(payer)
+        redirect_url = checkout_redirect_url()
+        metadata = build_checkout_metadata(
+            txn, association, payer, base_amount, transaction_fee, total_with_fees
+        )
 
         logger.info(
             f"[INITIATE] ref={txn.reference_id} base={base_amount} fee={transaction_fee} total={total_with_fees}"
@@ -413,9 +614,7 @@ def ercaspay_webhook(request):
     try:
         # Try to find transaction by either reference
         txn = Transaction.objects.filter(
-            models.Q(reference_id=pay_ref) | 
-            models.Q(reference_id=tx_ref) |
-            models.Q(payment_provider_reference=tx_ref)
+            webhook_transaction_lookup(pay_ref, tx_ref)
         ).first()
         
         if not txn:
@@ -447,7 +646,8 @@ def ercaspay_webhook(request):
             amount_paid = data.get("amount", 0)
             
             txn.is_verified = True
-            txn.save(update_fields=["is_verified"])
+            txn.is_expired = False
+            txn.save(update_fields=["is_verified", "is_expired"])
             
             logger.info(f"[ERCASPAY_WEBHOOK][VERIFIED] ref={txn.reference_id} status={status_str} amount={amount_paid}")
             print(f"[{timezone.now().isoformat()}] ERCASPAY VERIFIED ref={txn.reference_id}")
@@ -492,7 +692,8 @@ class PaymentStatusView(APIView):
                     
                     if status_str in ["success", "successful", "paid"]:
                         txn.is_verified = True
-                        txn.save(update_fields=["is_verified"])
+                        txn.is_expired = False
+                        txn.save(update_fields=["is_verified", "is_expired"])
                         
                         logger.info(f"[PAYMENT_STATUS][POLLING_VERIFIED] ref={txn.reference_id} status={status_str}")
                         print(f"[{timezone.now().isoformat()}] POLLING VERIFIED ref={txn.reference_id}")
@@ -0,0 +1,72 @@
+"""
+Precomputed Cloudinary delivery URLs.
+
+Building a Cloudinary URL runs the SDK's option merging, signing and
+formatting code, which adds up when every row of a list or every email
+context does it. Models with a CloudinaryField keep the URLs in plain
+columns instead, refreshed by refresh_cloudinary_urls() from save() when a
+new file is uploaded. The stored value includes the asset version, so a
+re-upload always gets a new URL.
+"""
+
+from django.core.files.uploadedfile import UploadedFile
+
+# Square thumbnails for dashboard lists; PDFs render their first page
+LOGO_THUMBNAIL = {
+    "width": 96,
+    "height": 96,
+    "crop": "fill",
+    "quality": "auto",
+    "format": "jpg",
+}
+PROOF_THUMBNAIL = {
+    "width": 240,
+    "height": 240,
+    "crop": "fill",
+    "quality": "auto",
+    "format": "jpg",
+    "page": 1,
+}
+
+
+def cloudinary_urls(resource, thumbnail):
+    """(url, thumbnail url) of a CloudinaryResource, or ("", "") when empty"""
+    if not resource:
+        return "", ""
+    return resource.url, resource.build_url(**thumbnail)
+
+
+def refresh_cloudinary_urls(instance, field_name, url_field, thumbnail_field, thumbnail):
+    """
+    Upload a pending file on `field_name` now (instead of in the field's
+    pre_save) and store its URLs on `url_field` and `thumbnail_field`.
+    URLs are only rebuilt when the asset changed or they are missing.
+    Returns the names of the URL fields that changed.
+    """
+    field = instance._meta.get_field(field_name)
+    value = getattr(instance, field_name)
+    # Values loaded from the database are CloudinaryResources; an upload or
+    # an assigned public id string means the asset changed
+    changed = isinstance(value, (UploadedFile, str))
+    if isinstance(value, UploadedFile):
+        # CloudinaryField.pre_save uploads and swaps in the stored resource
+        field.pre_save(instance, instance._state.adding)
+        value = getattr(instance, field_name)
+    elif isinstance(value, str) and value:
+        value = field.to_python(value)
+
+    current = (getattr(instance, url_field), getattr(instance, thumbnail_field))
+    if not value:
+        urls = ("", "")
+    elif changed or not current[0]:
+        urls = cloudinary_urls(value, thumbnail)
+    else:
+        return []
+
+    setattr(instance, url_field, urls[0])
+    setattr(instance, thumbnail_field, urls[1])
+    return [
+        name
+        for name, old, new in zip((url_field, thumbnail_field), current, urls)
+        if old != new
+    ]
@@ -0,0 +1,116 @@
+"""
+Streaming upload handling for proofs of payment and association logos.
+
+MaxSizeUploadHandler runs first in FILE_UPLOAD_HANDLERS and aborts an upload
+as soon as it passes MAX_UPLOAD_SIZE, before the rest is read. Files that
+pass are spooled to disk above FILE_UPLOAD_MAX_MEMORY_SIZE, so a worker's
+memory does not grow with concurrent uploads. File types come from the
+leading magic bytes, not from the client's Content-Type header.
+"""
+
+import io
+
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.http.multipartparser import MultiPartParserError
+
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+# Longest side of stored image proofs; plenty for OCR and admin review
+MAX_IMAGE_DIMENSION = 2000
+SNIFF_BYTES = 16
+
+MAGIC_NUMBERS = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+)
+
+# Pillow format and encoder options used when re-encoding a downsampled image
+DOWNSAMPLE_FORMATS = {
+    "image/jpeg": ("JPEG", {"quality": 85, "optimize": True}),
+    "image/png": ("PNG", {"optimize": True}),
+    "image/webp": ("WEBP", {"quality": 85}),
+}
+
+
+class UploadTooLarge(MultiPartParserError):
+    pass
+
+
+def sniff_content_type(header):
+    """Content type for a file's leading bytes, or None if not a supported type"""
+    for magic, content_type in MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return content_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def sniff_file(file):
+    """sniff_content_type() of a file's first bytes, leaving it rewound"""
+    file.seek(0)
+    header = file.read(SNIFF_BYTES)
+    file.seek(0)
+    return sniff_content_type(header)
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """
+    Reject any file over MAX_UPLOAD_SIZE while it is streaming in. The
+    chunks are passed on unchanged to the memory/temporary-file handlers.
+    """
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > MAX_UPLOAD_SIZE:
+            raise UploadTooLarge(
+                f"File size cannot exceed {MAX_UPLOAD_SIZE // (1024 * 1024)}MB."
+            )
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def downsample_image(file, max_dimension=MAX_IMAGE_DIMENSION):
+    """
+    `file` with its longest side reduced to `max_dimension`, as a new
+    in-memory upload. Files that are not oversized JPEG/PNG/WebP images are
+    returned unchanged (rewound).
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    content_type = sniff_file(file)
+    if content_type not in DOWNSAMPLE_FORMATS:
+        return file
+    image_format, save_options = DOWNSAMPLE_FORMATS[content_type]
+
+    try:
+        with Image.open(file) as image:
+            if max(image.size) <= max_dimension:
+                file.seek(0)
+                return file
+            # JPEG: decode at a reduced scale instead of at full resolution
+            image.draft("RGB", (max_dimension, max_dimension))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            output = io.BytesIO()
+            image.save(output, image_format, **save_options)
+    except (UnidentifiedImageError, OSError, ValueError):
+        file.seek(0)
+        return file
+
+    size = output.tell()
+    output.seek(0)
+    return InMemoryUploadedFile(
+        output,
+        getattr(file, "field_name", None),
+        file.name,
+        content_type,
+        size,
+        None,
+    )
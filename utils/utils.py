@@ -1,5 +1,7 @@
 from django.core.exceptions import ValidationError
 
+from .uploads import MAX_UPLOAD_SIZE, sniff_file
+
 
 def validate_file_type(file):
     """Validate file type (image or PDF only) and size (max 5MB)"""
@@ -7,23 +9,19 @@ def validate_file_type(file):
     if hasattr(file, "public_id"):  # Cloudinary objects have public_id
         return
 
-    # Only validate for new file uploads
+    # Only validate for new file uploads. The type comes from the file's
+    # magic bytes; the client-supplied content_type is not trusted.
     if hasattr(file, "content_type"):
-        allowed_types = [
-            "image/jpeg",
-            "image/png",
-            "image/gif",
-            "image/webp",
-            "image/jpg",
-            "application/pdf",
-        ]
-        if file.content_type not in allowed_types:
+        content_type = sniff_file(file)
+        if content_type is None:
             raise ValidationError(
                 "Unsupported file type. Please upload JPEG, PNG, GIF, WebP images or PDF files only."
             )
+        file.content_type = content_type
 
-    # Check file size (limit to 5MB)
-    if hasattr(file, "size") and file.size > 5 * 1024 * 1024:
+    # Check file size (limit to 5MB); larger uploads are already stopped
+    # mid-stream by utils.uploads.MaxSizeUploadHandler
+    if hasattr(file, "size") and file.size > MAX_UPLOAD_SIZE:
         raise ValidationError("File size cannot exceed 5MB.")
 
 
@@ -33,8 +31,9 @@ def validate_image_file(file):
     if hasattr(file, "public_id"):
         return
 
+    validate_file_type(file)
+
+    # content_type now holds the sniffed type
     if hasattr(file, "content_type"):
         if not file.content_type.startswith("image/"):
             raise ValidationError("Please upload a valid image file.")
-
-    validate_file_type(file)